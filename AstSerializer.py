@@ -0,0 +1,237 @@
+import gc
+import sys
+import struct
+from array import array
+from collections import deque
+
+import Parser_java
+from Lexer_java import Token
+from Parser_java import Node
+
+
+"""
+Двоичный формат дерева разбора (.jast) без pickle: загрузка создает только
+узлы Node из Parser_java, токены, списки и строки, поэтому файл из чужих рук
+не исполняет код.
+
+Все объекты дерева пронумерованы в одной таблице:
+    None, <незаданный слот>, токены, узлы (сгруппированы по видам), списки, строки
+Значение любого поля или элемента списка - номер объекта в этой таблице.
+Поля узлов одного вида лежат столбцами в порядке fields его класса, поэтому
+загрузчик сначала создает все объекты, а потом заполняет слоты целыми
+столбцами, без разбора дерева по узлам. Порядок узлов в файле не важен,
+общие поддеревья и глубина дерева ничем не ограничены.
+
+    заголовок  MAGIC, VERSION, число строк, видов, токенов, списков, слов,
+               байт строк, номер корня
+    lengths    длины строк в байтах
+    kinds      пары (имя класса - номер строки, число узлов)
+    tokens     пары (name, value) - номера строк
+    sizes      длины списков
+    words      столбцы полей по видам, затем элементы списков
+    blob       строки в UTF-8 подряд
+Все числа - u32 little-endian.
+"""
+MAGIC = b"JAST"
+VERSION = 1
+SUFFIX = ".jast"
+
+HEADER = struct.Struct("<4sIIIIIIII")
+NONE, UNSET = 0, 1
+
+
+class AstFormatError(Exception):
+    pass
+
+
+# Значение незаданного слота (например, headerProgram у пустой программы)
+_unset = object()
+
+
+def _le(a):
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def dumps(root) -> bytes:
+    # Собираем все объекты дерева обходом явным стеком; id - чтобы общие объекты попали один раз
+    groups = {}
+    tokens = []
+    lists = []
+    seen = set()
+    stack = [root]
+    while stack:
+        value = stack.pop()
+        if type(value) is str or value is None or id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, Node):
+            groups.setdefault(type(value), []).append(value)
+            stack.extend(getattr(value, name, None) for name in value.fields)
+        elif isinstance(value, list):
+            lists.append(value)
+            stack.extend(value)
+        elif isinstance(value, Token):
+            tokens.append(value)
+        else:
+            raise AstFormatError(f"Cannot serialize {type(value).__name__}")
+
+    index = {}
+    for obj in tokens:
+        index[id(obj)] = len(index) + 2
+    for nodes in groups.values():
+        for obj in nodes:
+            index[id(obj)] = len(index) + 2
+    for obj in lists:
+        index[id(obj)] = len(index) + 2
+    string_base = len(index) + 2
+    strings = {}
+
+    def ref(value):
+        if type(value) is str:
+            s = strings.get(value)
+            if s is None:
+                s = strings[value] = len(strings)
+            return string_base + s
+        if value is None:
+            return NONE
+        if value is _unset:
+            return UNSET
+        return index[id(value)]
+
+    def string(value):
+        return ref(value) - string_base
+
+    words = array("I")
+    kinds = array("I")
+    for cls, nodes in groups.items():
+        kinds.append(string(cls.__name__))
+        kinds.append(len(nodes))
+        for name in cls.fields:
+            words.extend(ref(getattr(node, name, _unset)) for node in nodes)
+    for value in lists:
+        words.extend(map(ref, value))
+    sizes = array("I", map(len, lists))
+    token_words = array("I")
+    for token in tokens:
+        token_words.append(string(token.name))
+        token_words.append(string(token.value))
+    root_index = ref(root)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    lengths = array("I", map(len, encoded))
+    blob = b"".join(encoded)
+    return b"".join([
+        HEADER.pack(MAGIC, VERSION, len(lengths), len(groups), len(tokens), len(lists),
+                    len(words), len(blob), root_index),
+        _le(lengths).tobytes(), _le(kinds).tobytes(), _le(token_words).tobytes(),
+        _le(sizes).tobytes(), _le(words).tobytes(), blob,
+    ])
+
+
+def _kind(name):
+    cls = getattr(Parser_java, name, None)
+    if not (isinstance(cls, type) and issubclass(cls, Node) and cls.fields):
+        raise AstFormatError(f"Unknown node kind '{name}'")
+    return cls
+
+
+"""
+Загрузка дерева из байтов. Пока создаются сотни тысяч объектов, циклический
+сборщик мусора выключен: он не нашел бы в новом дереве ничего освобождаемого,
+а без этого проходы по растущему числу объектов занимают большую часть времени.
+"""
+def loads(data):
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _loads(data)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _loads(data):
+    if len(data) < HEADER.size:
+        raise AstFormatError("Truncated header")
+    magic, version, nstrings, nkinds, ntokens, nlists, nwords, nblob, root = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise AstFormatError("Not a serialized AST")
+    if version != VERSION:
+        raise AstFormatError(f"Unsupported AST format version {version}, expected {VERSION}")
+    offset = HEADER.size
+    tables = []
+    for count in (nstrings, 2 * nkinds, 2 * ntokens, nlists, nwords):
+        chunk = data[offset:offset + 4 * count]
+        if len(chunk) != 4 * count:
+            raise AstFormatError("Truncated table")
+        a = array("I")
+        a.frombytes(chunk)
+        tables.append(_le(a))
+        offset += 4 * count
+    lengths, kinds, token_words, sizes, words = tables
+    blob = data[offset:offset + nblob]
+    if len(blob) != nblob or sum(lengths) != nblob:
+        raise AstFormatError("Truncated string table")
+
+    strings = []
+    pos = 0
+    try:
+        for length in lengths:
+            strings.append(blob[pos:pos + length].decode("utf-8"))
+            pos += length
+    except UnicodeDecodeError:
+        raise AstFormatError("Corrupted string table")
+
+    try:
+        # Сначала создаем все объекты - пустые узлы и списки, затем заполняем их
+        objects = [None, _unset]
+        objects += [Token(strings[token_words[i]], strings[token_words[i + 1]])
+                    for i in range(0, len(token_words), 2)]
+        kind_classes = [(_kind(strings[kinds[i]]), kinds[i + 1]) for i in range(0, len(kinds), 2)]
+        # Поля всех узлов лежат в words - больше узлов, чем слов под них, быть не может
+        if sum(len(cls.fields) * count for cls, count in kind_classes) > nwords:
+            raise AstFormatError("Corrupted node table")
+        groups = []
+        for cls, count in kind_classes:
+            nodes = list(map(cls.__new__, [cls] * count))
+            groups.append((cls, nodes))
+            objects += nodes
+        lists = [[] for _ in sizes]
+        objects += lists
+        objects += strings
+        values = [objects[w] for w in words]
+        root = objects[root]
+    except IndexError:
+        raise AstFormatError("Corrupted object table")
+
+    pos = 0
+    for cls, nodes in groups:
+        count = len(nodes)
+        for name in cls.fields:
+            column = values[pos:pos + count]
+            pos += count
+            setter = getattr(cls, name).__set__
+            targets = nodes
+            if _unset in column:
+                targets = [n for n, v in zip(nodes, column) if v is not _unset]
+                column = [v for v in column if v is not _unset]
+            # Слоты заполняются целым столбцом на уровне C
+            deque(map(setter, targets, column), maxlen=0)
+    for target, size in zip(lists, sizes):
+        target.extend(values[pos:pos + size])
+        pos += size
+    if pos != len(values) or not isinstance(root, Node):
+        raise AstFormatError("Corrupted value table")
+    return root
+
+
+def save(program, path):
+    with open(path, "wb") as f:
+        f.write(dumps(program))
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
@@ -1,6 +1,22 @@
+import io
+
+
 class CodeGenerator:
     def __init__(self, source):
         self.source = source
 
+    # Пишет программу на C# в out по фрагментам, не собирая ее в одну строку
+    def write(self, out):
+        # Заголовок есть только у разобранной программы, у пустой его нет
+        out.write(getattr(self.source, "headerProgram", "") + "\n{\n")
+        self.source.emit(out)
+        out.write("}")
+
+    def save(self, path):
+        with open(path, "w") as file:
+            self.write(file)
+
     def __repr__(self) -> str:
-        return self.source.headerProgram + "\n{\n" + self.source.getGeneratedText() + "}"
+        out = io.StringIO()
+        self.write(out)
+        return out.getvalue()
@@ -0,0 +1,171 @@
+import io
+import re
+import hashlib
+
+from Lexer_java import Lexer
+from Parser_java import Parser, NodeMethod, NodeProgram
+from SymbolTable import SymbolTable, Symbol
+from CodeGenerator import CodeGenerator
+from Translator import parse_text, make_lexer
+from Optimizer import fold_constants, eliminate_dead_code
+from Stats import timer
+
+
+class IncrementalStats:
+    def __init__(self):
+        self.reused = 0
+        self.parsed = 0
+        self.full = 0
+
+    def __repr__(self):
+        return f"{self.reused} methods reused, {self.parsed} parsed, {self.full} full parses"
+
+
+"""
+Повторный перевод одного файла с точностью до метода. Текст делится на
+заголовок класса и области методов по парам фигурных скобок (скобки внутри
+строк, символов и комментариев не считаются), каждая область хэшируется.
+Метод, у которого не изменились ни текст области, ни объявленные до него
+методы (они лежат в таблице символов на уровне класса и влияют на разбор
+тела), берется из прошлого перевода вместе со своим NodeMethod и текстом
+на C#; остальные области лексер и парсер разбирают по отдельности.
+
+Если файл не делится на методы или в какой-то области есть ошибка, файл
+разбирается целиком, как в Translator.translate, - так номера строк и позиции
+в сообщениях об ошибках всегда совпадают с полным разбором.
+"""
+class IncrementalTranslator:
+    # Скобки и то, внутри чего скобки не считаются, - как в Lexer.MASTER
+    BRACES = re.compile(r"//[^\n]*|/\*.*?\*/|\"[^\"]*\"?|'.'?|[{}]", re.DOTALL)
+
+    def __init__(self, engine=Lexer.CHAR_ENGINE):
+        # Движок лексера для методов и для полного разбора файла
+        self.engine = engine
+        # (хэш области, хэш методов до нее) -> (NodeMethod, текст на C#)
+        self.methods = {}
+        self.program = None
+        self.stats = IncrementalStats()
+
+    def translate_file(self, source) -> str:
+        with open(source, "r") as f:
+            return self.translate(f.read(), source)
+
+    # source - имя файла для сообщений об ошибках
+    def translate(self, text, source=None) -> str:
+        split = self.split(text)
+        if split is not None:
+            result = self._translate_regions(text, *split)
+            if result is not None:
+                return result
+        self.stats.full += 1
+        self.methods = {}
+        self.program = parse_text(text, self.engine, source or "<text>")
+        return str(CodeGenerator(self.program))
+
+    """
+    Границы частей файла: конец заголовка (после '{' класса) и концы областей
+    методов (после закрывающей '}' тела). None, если файл устроен не как
+    "заголовок { метод ... метод }".
+    """
+    @classmethod
+    def split(cls, text):
+        header_end = None
+        ends = []
+        depth = 0
+        for m in cls.BRACES.finditer(text):
+            brace = m.group()
+            if brace == "{":
+                depth += 1
+                if header_end is None:
+                    header_end = m.end()
+            elif brace == "}":
+                depth -= 1
+                if depth == 1:
+                    ends.append(m.end())
+                elif depth == 0:
+                    # Закрытие класса - после него в файле ничего не должно быть
+                    if text[m.end():].strip() or not ends:
+                        return None
+                    return header_end, ends
+                elif depth < 0:
+                    return None
+        return None
+
+    def _translate_regions(self, text, header_end, ends):
+        header = parse_header(text[:header_end], self.engine)
+        if header is None:
+            return None
+        methods = {}
+        parts = [header, "\n{\n"]
+        nodes = []
+        # Общая для всех областей таблица методов класса, как при полном разборе
+        symbols = SymbolTable()
+        prefix = hashlib.blake2b(digest_size=16)
+        start = header_end
+        for end in ends:
+            region = text[start:end]
+            key = (hashlib.blake2b(region.encode(), digest_size=16).digest(), prefix.digest())
+            cached = self.methods.get(key)
+            if cached is None:
+                method = parse_method(region, symbols, self.engine)
+                if method is None:
+                    return None
+                cached = (method, method.getGeneratedText())
+                self.stats.parsed += 1
+            else:
+                self.stats.reused += 1
+                symbols.declare(cached[0].id, cached[0].ret_type.lower(), Symbol.METHOD)
+            methods[key] = cached
+            method, generated = cached
+            nodes.append(method)
+            parts.append(generated)
+            parts.append("\n")
+            # Методы, объявленные до следующей области, входят в ее ключ
+            prefix.update(f"{method.id}\0{method.ret_type.lower()}\0".encode())
+            start = end
+        parts.append("}")
+        self.methods = methods
+        self.program = NodeProgram(nodes)
+        self.program.setHeader(header)
+        return "".join(parts)
+
+
+def _parser(text, engine, stats=None):
+    return Parser(make_lexer(io.StringIO(text), engine, stats), recover=True)
+
+
+# Заголовок класса "public class <ID> {" - как его строит Parser.parse
+def parse_header(text, engine=Lexer.CHAR_ENGINE):
+    parser = _parser(text, engine)
+    try:
+        program = parser.parse()
+    except Exception:
+        return None
+    if parser.diagnostics:
+        return None
+    return program.headerProgram
+
+
+# Один метод; symbols - таблица с методами класса, объявленными до него.
+# С stats (TranslationStats) в него добавляются время фаз и счетчики, кроме числа узлов
+def parse_method(text, symbols, engine=Lexer.CHAR_ENGINE, stats=None):
+    parser = _parser(text, engine, stats)
+    # Разобранный без ошибок метод сам объявляется в symbols на уровне класса
+    parser.symbolTable = symbols
+    try:
+        with timer(stats, "parse"):
+            method = parser.statement()
+        # Вся область должна уйти на этот метод, вплоть до конца текста
+        if parser.token.value != "EOF":
+            return None
+    except Exception:
+        return None
+    if parser.diagnostics or not isinstance(method, NodeMethod):
+        return None
+    with timer(stats, "optimize"):
+        folded = fold_constants(method)
+        eliminated = eliminate_dead_code(method)
+    if stats is not None:
+        stats.folded += folded
+        stats.eliminated += eliminated
+    return method
@@ -1,3 +1,7 @@
+import re
+from array import array
+
+
 class help:
     ACCESS_MODIFIERS = {
         "public": "PUBLIC",
@@ -89,9 +93,22 @@ class Token:
         return f"{self.name}\t:{self.value}"
 
 
+"""
+Префиксное дерево лексем: вложенные словари по символам, значение токена
+лежит в узле под ключом None. Из него берется самое длинное совпадение
+одним проходом вперед по тексту, без возврата указателя.
+"""
+def build_trie(items):
+    trie = {}
+    for word, value in items:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[None] = value
+    return trie
+
+
 class Lexer:
-    text = ""
-    flow_lexem = []
     START, COMMENT, EOF, STRING, CHAR, OPERATOR, ID, INT, DOUBLE, BOOLEAN = range(10)
     STATES = {
         START: "START",
@@ -106,8 +123,29 @@ class Lexer:
         BOOLEAN: "boolean"
     }
 
-    def __init__(self, source):
-        if self.text == "":
+    # Движки лексического анализа: посимвольный (get_char), на одном общем регулярном
+    # выражении и потоковый - то же регулярное выражение над окном ограниченного размера
+    CHAR_ENGINE, REGEX_ENGINE, STREAM_ENGINE = "char", "regex", "stream"
+    # Сколько символов потоковый движок дочитывает из файла за раз
+    CHUNK_SIZE = 1 << 16
+    LOOKAHEAD = 2
+
+    def __init__(self, source, engine=CHAR_ENGINE):
+        # Все состояние лексера хранится в экземпляре, поэтому лексеры
+        # в разных потоках одного процесса друг другу не мешают
+        self.text = ""
+        self.flow_lexem = []
+        if engine == Lexer.STREAM_ENGINE:
+            # source - путь или уже открытый текстовый файл; целиком он не читается
+            self.own_file = not hasattr(source, "read")
+            self.file = open(source, "r") if self.own_file else source
+            self.cursor = 0
+            self.offset = 0
+            self.eof = False
+        elif hasattr(source, "read"):
+            # Уже открытый текстовый файл (например, io.StringIO с текстом программы)
+            self.text = source.read()
+        else:
             with open(source, "r") as file:
                 self.text = file.read()
         self.state = None
@@ -116,6 +154,17 @@ class Lexer:
         self.position = -1
         self.lineno = 0
         self.len = len(self.text)
+        self.engine = engine
+        if engine == Lexer.REGEX_ENGINE:
+            self.line_start = 0
+            self.scan = Lexer.MASTER.scanner(self.text).match
+            self.get_next_token = self.get_next_token_regex
+        elif engine == Lexer.STREAM_ENGINE:
+            self.line_start = 0
+            self.scan = self.scan_window
+            self.get_next_token = self.get_next_token_regex
+        elif engine != Lexer.CHAR_ENGINE:
+            raise ValueError(f"Unknown lexer engine: {engine}")
 
     """
     Функция get_char смещает наш указатель (self.pos), потом
@@ -184,74 +233,48 @@ class Lexer:
                 accum += ch
                 return Token(accum, help.SPEC[ch])
             """
-            Если первым символом встретили не букву и не цифру, то проверяем находится ли
-            символ (ch) в OPERATORS, если да, то накапливаем все не буквы и не цифры,
-            которые идут следом и как только встретим что-то из OPERATORS, то возвращаем
-            полученный результат
-            
-            ============================ Возможны ошибки ============================
-            Надо проверить, что будет если наша последовательность не попадет в OPERATORS
+            Если первым символом встретили символ оператора, то ищем в OPERATOR_TRIE самый
+            длинный оператор (или начало комментария), который начинается с него, и сдвигаем
+            указатель ровно на его длину. Так "=-1" - это "=" и "-1", а "&&!" - "&&" и "!".
+            Позиция, как и раньше, - столбец сразу за оператором
             """
-            if ch in help.OPERATORS:
+            if ch in Lexer.OPERATOR_TRIE:
                 self.state = Lexer.OPERATOR
-                while self.state is not None:
-                    accum += ch
-                    ch = self.get_char()
-                    if accum == "//":
-                        while ch != "\n":
-                            ch = self.get_char()
-                    if ch == ";" or ch not in help.OPERATORS:
-                        self.state = None
-                self.pos -= 1
-                if accum == "//":
-                    accum = ""
-                    self.state = Lexer.COMMENT
-                elif accum in help.OPERATORS:
-                    return Token(accum, help.OPERATORS[accum])
-                else:
-                    raise SyntaxError("operator", self.lineno, self.position)
+                accum, value = self.match_operator()
+                self.pos += len(accum) - 1
+                self.position += len(accum)
+                if value != Lexer.STATES[Lexer.COMMENT]:
+                    return Token(accum, value)
+                self.skip_comment(Lexer.COMMENTS[accum])
+                accum = ""
+                self.state = Lexer.START
+                ch = self.get_char()
+                continue
 
             """
-            Если первым символом встретили букву, то переходим в состояние "ID" и начинаем собирать
-            следующие буквы и/или цифры до тех пор, пока собранная последовательность
-            не попадет в ACCESS_MODIFIERS, KEY_WORDS или DATA_TYPES. Если же не одну из
-            категорий не попало, то значит это ID
-            
-            ============================ Возможны ошибки ============================
-            Если в других методах не можете найти ошибку, то быть может она тут
+            Если первым символом встретили букву, то переходим в состояние "ID" и собираем
+            слово целиком - все следующие буквы и цифры, а у составных ключевых слов
+            (System.out.println) и части через точку. Только потом слово одним обращением
+            к Lexer.WORDS относится к ACCESS_MODIFIERS, KEY_WORDS, DATA_TYPES или true/false;
+            если его там нет, то это ID. Поэтому intValue - один ID, а не int и Value
             """
             if ch.isalpha():
-                while ch.isalnum():
-                    self.state = Lexer.ID
-                    accum += ch
-
-                    if accum == "System.out.print":
-                        ch = self.get_char()
-                        if ch == "l":
-                            accum += ch
-                            ch = self.get_char()
-                            accum += ch
-                            return Token(accum, help.KEY_WORDS[accum])
-                        else:
-                            self.pos -= 1
-                            return Token(accum, help.KEY_WORDS[accum])
-
-                    if accum in help.ACCESS_MODIFIERS:
-                        return Token(accum, help.ACCESS_MODIFIERS[accum])
-                    elif accum in help.KEY_WORDS:
-                        return Token(accum, help.KEY_WORDS[accum])
-                    elif accum in help.DATA_TYPES:
-                        return Token(accum, help.DATA_TYPES[accum])
-                    ch = self.get_char()
-                    if accum in {"System", "System.out"} and ch == ".":
+                self.state = Lexer.ID
+                while True:
+                    while ch.isalnum():
                         accum += ch
                         ch = self.get_char()
-                
+                    if ch != "." or accum not in Lexer.DOTTED_PREFIXES:
+                        break
+                    accum += ch
+                    ch = self.get_char()
                 self.pos -= 1
-                if accum == "false" or accum == "true":
-                    return Token(accum, help.DATA_TYPES[Lexer.STATES[Lexer.BOOLEAN]])
-                else:
+                value = Lexer.WORDS.get(accum)
+                if value is None:
                     return Token(accum, Lexer.STATES[Lexer.ID])
+                # Позиция ключевого слова - на его последнем символе, как до заглядывания вперед
+                self.position -= 1
+                return Token(accum, value)
             
             """
             Если первым символом встретили цифру, то переходим в состояние "NUM"
@@ -302,6 +325,189 @@ class Lexer:
                 self.state = Lexer.EOF
                 return Token("EOF", Lexer.STATES[Lexer.EOF])
 
+    # Комментарии: начало и то, чем комментарий заканчивается
+    COMMENTS = {"//": "\n", "/*": "*/"}
+    # Операторы и начала комментариев (их значение - COMMENT) для посимвольного движка
+    OPERATOR_TRIE = build_trie({**help.OPERATORS, **dict.fromkeys(COMMENTS, STATES[COMMENT])}.items())
+
+    # Все слова с особым значением в одной таблице: слово классифицируется одним поиском
+    WORDS = {**help.ACCESS_MODIFIERS, **help.KEY_WORDS, **help.DATA_TYPES,
+             "true": help.DATA_TYPES[STATES[BOOLEAN]], "false": help.DATA_TYPES[STATES[BOOLEAN]]}
+    # Начала составных слов, после которых точка продолжает слово: System, System.out
+    DOTTED_PREFIXES = {word[:i] for word in WORDS for i, c in enumerate(word) if c == "."}
+
+    # Самый длинный оператор из OPERATOR_TRIE с символа self.pos: (текст, значение токена)
+    def match_operator(self):
+        text = self.text
+        node = Lexer.OPERATOR_TRIE
+        i = end = self.pos
+        value = None
+        while i < self.len:
+            node = node.get(text[i])
+            if node is None:
+                break
+            i += 1
+            if None in node:
+                end, value = i, node[None]
+        if value is None:
+            raise SyntaxError("operator", self.lineno, self.position)
+        return text[self.pos:end], value
+
+    # Пропуск комментария до terminator; self.pos стоит на последнем символе его начала
+    def skip_comment(self, terminator):
+        start = self.pos + 1
+        if terminator == "\n":
+            end = self.text.find("\n", start)
+            # Сам перевод строки прочитает get_next_token и посчитает строку
+            self.pos = (self.len if end == -1 else end) - 1
+            return
+        end = self.text.find(terminator, start)
+        if end == -1:
+            raise SyntaxError("comment", self.lineno, self.position)
+        end += len(terminator)
+        lines = self.text.count("\n", start, end)
+        if lines:
+            self.lineno += lines
+            self.position = end - self.text.rindex("\n", start, end) - 2
+        else:
+            self.position += end - start
+        self.pos = end - 1
+
+    """
+    Общее регулярное выражение для движка REGEX_ENGINE. Каждая альтернатива
+    соответствует одной ветке get_next_token, так что поток токенов тот же,
+    но сам цикл по символам выполняется внутри re, а не в Python.
+    Слово, как и в посимвольном разборе, берется целиком (вместе с частями
+    через точку после DOTTED_PREFIXES) и только потом ищется в WORDS.
+    """
+    MASTER = re.compile(
+        r"(?P<WS>[ \t\n]*)(?:"
+        r"(?P<COMMENT>//[^\n]*|/\*.*?\*/)"
+        r"|(?P<OPEN_COMMENT>/\*)"
+        r"|(?P<SPEC>[" + re.escape("".join(k for k in help.SPEC if len(k) == 1)) + r"])"
+        r"|(?P<WORD>(?:" + "|".join(re.escape(p) + r"\." for p in sorted(DOTTED_PREFIXES, key=len, reverse=True)) +
+        r")[^\W_]*|[^\W\d_][^\W_]*)"
+        r"|(?P<OPERATOR>" + "|".join(re.escape(k) for k in sorted(help.OPERATORS, key=len, reverse=True)) + r")"
+        r"|(?P<NUM>\d+(?:\.\d*)?)"
+        r"|(?P<STRING>\"[^\"]*\"?)"
+        r"|(?P<CHAR>'.'?)"
+        r")",
+        re.DOTALL
+    )
+    # Символы, на которых может закончиться число
+    NUM_END = {";", *help.IGNORE, *help.SPEC, *help.OPERATORS}
+    # Значения токенов, которые не зависят от текста лексемы
+    KIND_VALUES = {
+        "INT": help.DATA_TYPES[STATES[INT]],
+        "DOUBLE": help.DATA_TYPES[STATES[DOUBLE]],
+        "STRING": help.DATA_TYPES[STATES[STRING]],
+        "CHAR": help.DATA_TYPES[STATES[CHAR]],
+        "BOOLEAN": help.DATA_TYPES[STATES[BOOLEAN]],
+    }
+
+    def get_next_token_regex(self):
+        value, start, end = self.scan_regex()
+        if value == "EOF":
+            return Token("EOF", value)
+        return Token(self.text[start:end], value)
+
+    """
+    Один шаг движка REGEX_ENGINE: возвращает значение токена и границы
+    его текста в self.text (для строк и char - без кавычек), не создавая Token.
+    """
+    def scan_regex(self):
+        m = self.scan()
+        while m is not None:
+            ws_start, start = m.span(1)
+            kind = m.lastgroup
+            # Переводы строк считаются в пробелах перед лексемой и внутри /* */
+            end = m.end() if kind == "COMMENT" else start
+            if ws_start != end:
+                lines = self.text.count("\n", ws_start, end)
+                if lines:
+                    self.lineno += lines
+                    self.line_start = self.text.rindex("\n", 0, end) + 1
+            if kind != "COMMENT":
+                break
+            m = self.scan()
+        else:
+            # Конец файла или неизвестный символ - как и в get_next_token, это EOF
+            self.state = Lexer.EOF
+            return Lexer.STATES[Lexer.EOF], self.pos + 1, self.pos + 1
+
+        end = m.end()
+        self.pos = end - 1
+        self.position = end - self.line_start
+        self.state = None
+
+        if kind == "WORD":
+            return Lexer.WORDS.get(self.text[start:end], "ID"), start, end
+        if kind == "SPEC":
+            return help.SPEC[self.text[start]], start, end
+        accum = self.text[start:end]
+        if kind == "OPERATOR":
+            return help.OPERATORS[accum], start, end
+        if kind == "OPEN_COMMENT":
+            raise SyntaxError("comment", self.lineno, self.position)
+        if kind == "NUM":
+            nxt = self.text[end:end + 1]
+            if "." in accum:
+                if accum[-1] == "." and nxt in Lexer.NUM_END and nxt != ".":
+                    raise SyntaxError("real number", self.lineno, self.position)
+                if nxt == "." or nxt not in Lexer.NUM_END:
+                    raise SyntaxError("double", self.lineno, self.position)
+                return Lexer.KIND_VALUES["DOUBLE"], start, end
+            if nxt not in Lexer.NUM_END:
+                raise SyntaxError("integer", self.lineno, self.position)
+            return Lexer.KIND_VALUES["INT"], start, end
+        if kind == "STRING":
+            if len(accum) > 1 and accum[-1] == '"':
+                return Lexer.KIND_VALUES["STRING"], start + 1, end - 1
+            return Lexer.KIND_VALUES["STRING"], start + 1, end
+        # CHAR
+        if len(accum) != 3:
+            raise SyntaxError("char", self.lineno, self.position)
+        return Lexer.KIND_VALUES["CHAR"], start + 1, start + 2
+
+    """
+    Источник совпадений для потокового движка. self.text здесь - только окно
+    файла: совпадение принимается, если оно не упирается в конец окна, иначе
+    уже разобранная часть окна отбрасывается и дочитывается следующий кусок.
+    Так окно не превышает CHUNK_SIZE плюс длину самой длинной лексемы.
+    """
+    def scan_window(self):
+        while True:
+            m = Lexer.MASTER.match(self.text, self.cursor)
+            if self.eof:
+                break
+            # После совпадения в окне должно остаться еще LOOKAHEAD символов: слово, число
+            # или "System." у края окна может продолжиться в следующем куске
+            # Незакрытый в окне /* может закрыться в следующем куске
+            if m is not None and m.end() + Lexer.LOOKAHEAD <= len(self.text) and m.lastgroup != "OPEN_COMMENT":
+                break
+            # Не совпало на непробельном хвосте длиннее LOOKAHEAD - это неизвестный символ,
+            # а не лексема, оборванная концом окна
+            if m is None and len(self.text[self.cursor:].strip("".join(help.IGNORE))) > Lexer.LOOKAHEAD:
+                break
+            self.fill()
+        if m is not None:
+            self.cursor = m.end()
+        return m
+
+    def fill(self):
+        chunk = self.file.read(Lexer.CHUNK_SIZE)
+        if chunk == "":
+            self.eof = True
+            if self.own_file:
+                self.file.close()
+        shift = self.cursor
+        self.text = self.text[shift:] + chunk
+        self.cursor = 0
+        self.offset += shift
+        self.line_start -= shift
+        self.pos -= shift
+        self.len = len(self.text)
+
     """
     Начало начало - метод parse. Он открывает файл с исходным кодом на Java
     считывает оттуда все строки и пошло поехало...
@@ -316,6 +522,242 @@ class Lexer:
         return self.get_next_token()
 
 
+"""
+Буфер токенов целого файла в виде столбцов: код вида токена в array('B'),
+начало и конец его текста в исходнике - в array('I'). Объекты Token не
+создаются при разборе файла, текст токена вырезается из исходника только
+когда парсер до него дошел. Для парсера буфер выглядит как обычный лексер:
+get_next_token, state, lineno и position - он просто идет по индексу.
+Лексическая ошибка, как и у остальных движков, бросается из get_next_token,
+когда парсер до нее дошел, и разбор после нее продолжается.
+"""
+class TokenBuffer:
+    # Все возможные значения токенов и их коды
+    KINDS = list(dict.fromkeys([
+        Lexer.STATES[Lexer.EOF], Lexer.STATES[Lexer.ID], *Lexer.KIND_VALUES.values(),
+        *help.ACCESS_MODIFIERS.values(), *help.KEY_WORDS.values(), *help.DATA_TYPES.values(),
+        *help.OPERATORS.values(), *help.SPEC.values(),
+    ]))
+    CODES = {kind: code for code, kind in enumerate(KINDS)}
+    EOF = CODES[Lexer.STATES[Lexer.EOF]]
+    # Имя режима для Translator и main.py --lexer
+    ENGINE = "buffer"
+
+    def __init__(self, lexer: Lexer):
+        if lexer.engine != Lexer.REGEX_ENGINE:
+            lexer = Lexer(lexer.source, Lexer.REGEX_ENGINE)
+        self.text = lexer.text
+        self.source = lexer.source
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        # Номер токена -> лексические ошибки перед ним; raised - сколько из них уже брошено
+        self.errors = {}
+        self.raised = 0
+        codes = TokenBuffer.CODES
+        scan = lexer.scan_regex
+        while True:
+            try:
+                value, start, end = scan()
+            except SyntaxError as e:
+                # scan_regex уже сдвинулся за ошибочную лексему
+                self.errors.setdefault(len(self.kinds), []).append(e)
+                continue
+            self.kinds.append(codes[value])
+            self.starts.append(start)
+            self.ends.append(end)
+            if value == "EOF":
+                break
+        self.index = -1
+        self.state = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def value(self, i) -> str:
+        return TokenBuffer.KINDS[self.kinds[i]]
+
+    def name(self, i) -> str:
+        if self.kinds[i] == TokenBuffer.EOF:
+            return "EOF"
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def token(self, i) -> Token:
+        return Token(self.name(i), self.value(i))
+
+    def get_next_token(self):
+        if self.errors:
+            errors = self.errors.get(self.index + 1)
+            if errors is not None and self.raised < len(errors):
+                self.raised += 1
+                raise errors[self.raised - 1]
+            self.raised = 0
+        if self.index < len(self.kinds) - 1:
+            self.index += 1
+        if self.kinds[self.index] == TokenBuffer.EOF:
+            self.state = Lexer.EOF
+        return self.token(self.index)
+
+    # Буфер и так хранит весь файл, поэтому заглядывание и метки - это просто номера токенов
+    # (тот же набор методов, что у TokenStream)
+    def peek(self, k=1) -> Token:
+        return self.token(min(self.index + k, len(self.kinds) - 1))
+
+    def mark(self):
+        return self.index
+
+    def reset(self, m):
+        self.index = m
+        self.raised = 0
+        self.state = Lexer.EOF if m >= 0 and self.kinds[m] == TokenBuffer.EOF else None
+
+    def release(self, m):
+        pass
+
+    # Номер строки и позиция нужны только для сообщений об ошибках, поэтому считаются по запросу
+    @property
+    def lineno(self):
+        return self.text.count("\n", 0, self.starts[max(self.index, 0)])
+
+    @property
+    def position(self):
+        start = self.starts[max(self.index, 0)]
+        return self.ends[max(self.index, 0)] - self.text.rfind("\n", 0, start) - 1
+
+
+
+"""
+Поток токенов между лексером и парсером с заглядыванием вперед. Парсер
+видит его как обычный лексер: get_next_token, lineno, position и state
+относятся к последнему отданному токену, даже если peek(k) уже прочитал
+лексером следующие. Прочитанные вперед токены лежат в кольцевом буфере
+вместе с lineno, position и state лексера на момент их чтения (лексическая
+ошибка - на месте своего токена, она бросается, когда до нее дойдет
+get_next_token), так что ничего не разбирается дважды.
+mark() запоминает место, reset(m) возвращается к нему, release(m) снимает
+метку (вместе с метками, поставленными после нее); каждая метка - свой
+номер, так что вложенные метки на одном месте не путаются. Пока метка есть, буфер хранит все токены после нее и при нехватке
+места растет вдвое. Без заглядывания и меток get_next_token идет мимо
+буфера прямо в лексер и ничего не копирует.
+"""
+class TokenStream:
+    def __init__(self, lexer, capacity=8):
+        self.lexer = lexer
+        # Обертку get_next_token (Stats.count_lexer) ставят до создания потока
+        self.next = lexer.get_next_token
+        # Емкость - степень двойки: номер ячейки - номер токена & mask
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.slots = [None] * size
+        self.mask = size - 1
+        # Номер последнего отданного токена и число прочитанных из лексера
+        self.index = -1
+        self.read = 0
+        # (номер метки, index, current) в порядке mark
+        self.marks = []
+        self.marked = 0
+        self.eof = None
+        # (токен, lineno, position, state) текущего токена; None - лексер стоит на нем самом
+        self.current = None
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno if self.current is None else self.current[1]
+
+    @property
+    def position(self):
+        return self.lexer.position if self.current is None else self.current[2]
+
+    @property
+    def state(self):
+        return self.lexer.state if self.current is None else self.current[3]
+
+    def get_next_token(self):
+        self.index += 1
+        if self.index == self.read and not self.marks:
+            # Впереди ничего не прочитано: токен идет прямо из лексера
+            self.read += 1
+            self.current = None
+            return self.next()
+        if self.index == self.read:
+            self._fill()
+        item = self.slots[self.index & self.mask]
+        if isinstance(item, SyntaxError):
+            raise item
+        self.current = item
+        return item[0]
+
+    # k-й токен после текущего (peek() - следующий) без сдвига; лексические ошибки пропускаются
+    def peek(self, k=1) -> Token:
+        self._pin()
+        i = self.index
+        while True:
+            i += 1
+            while i >= self.read:
+                self._fill()
+            item = self.slots[i & self.mask]
+            if isinstance(item, SyntaxError):
+                continue
+            k -= 1
+            if k == 0:
+                return item[0]
+
+    # Метка текущего места для reset; метки вкладываются, как стек
+    def mark(self):
+        self._pin()
+        self.marked += 1
+        self.marks.append((self.marked, self.index, self.current))
+        return self.marked
+
+    # Возврат к метке m: get_next_token снова отдаст токены, прочитанные после нее
+    def reset(self, m):
+        i = self._find(m)
+        _, self.index, self.current = self.marks[i]
+        del self.marks[i:]
+
+    def release(self, m):
+        del self.marks[self._find(m):]
+
+    def _find(self, m):
+        for i in range(len(self.marks) - 1, -1, -1):
+            if self.marks[i][0] == m:
+                return i
+        raise ValueError(f"Unknown or released mark {m}")
+
+    # Лексер уйдет вперед - запоминаем, где он стоял на текущем токене
+    def _pin(self):
+        if self.current is None:
+            lexer = self.lexer
+            self.current = (None, lexer.lineno, lexer.position, lexer.state)
+
+    def _fill(self):
+        # Нужные токены - после самой ранней метки или после текущего
+        low = (self.marks[0][1] if self.marks else self.index) + 1
+        if self.read - low == len(self.slots):
+            self._grow(low)
+        if self.eof is not None:
+            item = self.eof
+        else:
+            try:
+                token = self.next()
+                lexer = self.lexer
+                item = (token, lexer.lineno, lexer.position, lexer.state)
+                if token.value == Lexer.STATES[Lexer.EOF]:
+                    self.eof = item
+            except SyntaxError as e:
+                item = e
+        self.slots[self.read & self.mask] = item
+        self.read += 1
+
+    def _grow(self, low):
+        slots = [None] * (2 * len(self.slots))
+        mask = len(slots) - 1
+        for i in range(low, self.read):
+            slots[i & mask] = self.slots[i & self.mask]
+        self.slots = slots
+        self.mask = mask
+
 class SyntaxError(BaseException):
     def __init__(self, text, line, pos):
         self.text = text
@@ -0,0 +1,151 @@
+from Parser_java import Node, NodeProgram, NodeScope, NodeDeclaration, NodeAssigning, NodeFunctionCall, \
+    NodeBooleanLiteral, NodeIfConstruction, NodeWhileConstruction, NodeForConstruction, NodeSwitchConstruction
+
+
+"""
+Свертка констант: каждая операция, у которой все операнды - литералы,
+заменяется литералом с ее значением (Node.fold - семантика int/double/boolean
+Java). Обход идет снизу вверх, поэтому свернутый операнд тут же сворачивает
+и операцию над ним: (2 * 3 < 7) && !false превращается в true. Рекурсии нет -
+глубина выражения ограничена только памятью. Возвращает число замененных узлов.
+"""
+def fold_constants(tree) -> int:
+    folded = 0
+    # (узел, обработаны ли уже его дети)
+    stack = [(tree, False)]
+    while stack:
+        node, done = stack.pop()
+        if not done:
+            stack.append((node, True))
+            for _, value in node.items():
+                if isinstance(value, Node):
+                    stack.append((value, False))
+                elif isinstance(value, list):
+                    stack.extend((item, False) for item in value if isinstance(item, Node))
+            continue
+        for name, value in node.items():
+            if isinstance(value, Node):
+                literal = value.fold()
+                if literal is not None:
+                    setattr(node, name, literal)
+                    folded += 1
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    literal = item.fold() if isinstance(item, Node) else None
+                    if literal is not None:
+                        value[i] = literal
+                        folded += 1
+    return folded
+
+
+"""
+Удаление мертвого кода после свертки констант. В каждом списке инструкций:
+if с условием-литералом заменяется выбранной веткой или убирается, как и
+switch по литералу; while и for с условием false не выполняются ни разу
+(у for остается только присваивание из его заголовка, если оно меняет
+внешнюю переменную). Цикл с условием true бесконечен - break в циклах этой
+грамматики нет, - поэтому инструкции после него недостижимы и отбрасываются.
+Выбранная ветка вставляется в список как есть, а если в ней объявлены
+переменные - в NodeScope, чтобы они не столкнулись с соседними.
+Возвращает число убранных или замененных инструкций.
+"""
+def eliminate_dead_code(tree) -> int:
+    removed = 0
+    # (узел, обработаны ли уже его дети): вложенные блоки чистятся раньше внешних
+    stack = [(tree, False)]
+    while stack:
+        node, done = stack.pop()
+        if not done:
+            stack.append((node, True))
+            for _, value in node.items():
+                if isinstance(value, Node):
+                    stack.append((value, False))
+                elif isinstance(value, list):
+                    stack.extend((item, False) for item in value if isinstance(item, Node))
+            continue
+        if isinstance(node, NodeProgram):
+            removed += _prune(node.children)
+    return removed
+
+
+# Чистит список инструкций на месте; возвращает число убранных или замененных
+def _prune(statements) -> int:
+    result = []
+    removed = 0
+    for i, statement in enumerate(statements):
+        replacement = _reduce(statement)
+        if replacement is None:
+            result.append(statement)
+            if _never_exits(statement):
+                removed += len(statements) - i - 1
+                break
+            continue
+        removed += 1
+        result.extend(replacement)
+        if any(_never_exits(item) for item in replacement):
+            removed += len(statements) - i - 1
+            break
+    statements[:] = result
+    return removed
+
+
+# Инструкции, которыми заменяется statement, или None, если он остается как есть
+def _reduce(statement):
+    if isinstance(statement, NodeIfConstruction):
+        taken = _condition(statement.condition)
+        if taken is None:
+            return None
+        return _inline(statement.block if taken else statement.else_block)
+    if isinstance(statement, NodeWhileConstruction):
+        return [] if _condition(statement.condition) is False else None
+    if isinstance(statement, NodeForConstruction):
+        if _condition(statement.expr) is not False:
+            return None
+        init = statement.var_declr
+        if isinstance(init, NodeAssigning) and not isinstance(init.left_side, NodeDeclaration):
+            return [init]
+        # Объявление счетчика видно только в цикле, но вызов в его инициализаторе надо выполнить
+        if next(init.find(lambda node: isinstance(node, NodeFunctionCall)), None) is not None:
+            return None
+        return []
+    if isinstance(statement, NodeSwitchConstruction):
+        # Имя-идентификатор может быть и переменной, и строкой - такой switch не трогаем
+        if statement.tok.isidentifier():
+            return None
+        blocks = statement.blocks
+        block = blocks[-1]
+        for case, case_block in zip(statement.cases, blocks):
+            if case.name == statement.tok:
+                block = case_block
+                break
+        return _inline(block if block != "" else None)
+    return None
+
+
+def _condition(node):
+    if isinstance(node, NodeBooleanLiteral):
+        return {"true": True, "false": False}.get(node.value)
+    return None
+
+
+def _inline(block):
+    if block is None:
+        return []
+    if any(_declares(item) for item in block.children):
+        return [NodeScope(block)]
+    return list(block.children)
+
+
+def _declares(statement):
+    return isinstance(statement, NodeDeclaration) or \
+        isinstance(statement, NodeAssigning) and isinstance(statement.left_side, NodeDeclaration)
+
+
+def _never_exits(statement):
+    if isinstance(statement, NodeWhileConstruction):
+        return _condition(statement.condition) is True
+    if isinstance(statement, NodeForConstruction):
+        return _condition(statement.expr) is True
+    if isinstance(statement, NodeScope):
+        return any(_never_exits(item) for item in statement.block.children)
+    return False
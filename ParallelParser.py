@@ -0,0 +1,152 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from Lexer_java import Lexer, help, SyntaxError as LexerSyntaxError
+from Parser_java import NodeProgram
+from SymbolTable import SymbolTable, Symbol
+from CodeGenerator import CodeGenerator
+from Translator import parse_text, translate_text, make_lexer
+from Incremental import IncrementalTranslator, parse_header, parse_method
+from Stats import TranslationStats, CountingSymbolTable, timer
+import AstSerializer
+
+
+"""
+Разбор одного большого класса по методам в нескольких процессах. Текст
+делится на заголовок и области методов так же, как в IncrementalTranslator,
+и сначала из заголовка каждой области (public static <тип> <имя>) собираются
+методы класса - то, что Parser.statement объявляет в таблице символов на
+уровне класса. Потом области разбиваются на непрерывные куски примерно
+равной длины, и каждый процесс разбирает и переводит свой кусок по порядку,
+начав с таблицы, в которой уже объявлены все методы до куска, - поэтому
+тело метода видит ровно те же методы, что при полном разборе. Деревья
+возвращаются в формате AstSerializer и собираются в NodeProgram в порядке
+исходного текста, тексты на C# - в один текст. Для одного текста на C#
+(translate_methods) деревья из процессов не передаются вовсе.
+
+Методы читаются тем же движком engine, что и при полном разборе. Если файл не делится на методы, имена методов повторяются
+или в каком-то куске есть ошибка, файл разбирается целиком в этом процессе,
+как в Translator.parse_text, - сообщения об ошибках те же, что без разбиения.
+С stats (TranslationStats) в него складываются счетчики, собранные каждым
+процессом по своему куску, - время фаз, как и в пакетном режиме, это сумма
+по процессам. Без разбиения stats заполняет полный разбор.
+"""
+def parse_methods(text, name="<text>", engine=Lexer.CHAR_ENGINE, workers=None, executor=None, stats=None):
+    result = _parse_parallel(text, engine, workers, executor, True, stats)
+    if result is None:
+        program = parse_text(text, engine, name, stats)
+        with timer(stats, "codegen"):
+            return program, str(CodeGenerator(program))
+    return result
+
+
+# Текст на C# для текста программы с разбором методов в нескольких процессах
+def translate_methods(text, name="<text>", engine=Lexer.CHAR_ENGINE, workers=None, executor=None, stats=None) -> str:
+    result = _parse_parallel(text, engine, workers, executor, False, stats)
+    if result is None:
+        return translate_text(text, engine, name, stats)
+    return result[1]
+
+
+# (NodeProgram или None без tree, текст на C#) или None, если файл надо разбирать целиком
+def _parse_parallel(text, engine, workers, executor, tree, stats):
+    split = IncrementalTranslator.split(text)
+    if split is None:
+        return None
+    header_end, ends = split
+    header = parse_header(text[:header_end], engine)
+    if header is None:
+        return None
+    starts = [header_end] + ends[:-1]
+    regions = [text[start:end] for start, end in zip(starts, ends)]
+    methods = [_method_symbol(region, engine) for region in regions]
+    names = [method[0] for method in methods if method is not None]
+    if len(names) != len(methods) or len(set(names)) != len(names):
+        return None
+    jobs = []
+    for first, last in _chunks(regions, (workers or os.cpu_count() or 1) * 4):
+        jobs.append((regions[first:last], methods[:first], engine, tree, stats is not None))
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_chunk, jobs))
+    else:
+        results = list(executor.map(_parse_chunk, jobs))
+    if any(result is None for result in results):
+        return None
+    if stats is not None:
+        # Счетчики берутся, только если разбиение удалось, - иначе их соберет полный разбор
+        stats.files += 1
+        for *_, chunk_stats in results:
+            stats.merge(chunk_stats)
+        stats.nodes[NodeProgram.__name__] += 1
+    parts = [header, "\n{\n"]
+    for _, generated, _ in results:
+        for code in generated:
+            parts.append(code)
+            parts.append("\n")
+    parts.append("}")
+    if not tree:
+        return None, "".join(parts)
+    nodes = []
+    for data, _, _ in results:
+        nodes.extend(AstSerializer.loads(data).children)
+    program = NodeProgram(nodes)
+    program.setHeader(header)
+    return program, "".join(parts)
+
+
+# (имя, тип) метода из заголовка области - как их объявляет Parser.statement; None, если это не метод
+def _method_symbol(region, engine):
+    lexer = make_lexer(io.StringIO(region), engine)
+    try:
+        access, static, ret_type, _id = (lexer.get_next_token() for _ in range(4))
+    except LexerSyntaxError:
+        return None
+    if access.name not in help.ACCESS_MODIFIERS or static.name not in help.KEY_WORDS \
+            or ret_type.name not in help.DATA_TYPES or _id.value != "ID":
+        return None
+    return _id.name, ret_type.value.lower()
+
+
+# Границы (first, last) не больше count непрерывных кусков областей примерно равной длины
+def _chunks(regions, count):
+    total = sum(len(region) for region in regions)
+    bounds = []
+    first = 0
+    size = 0
+    for i, region in enumerate(regions):
+        size += len(region)
+        if size * count >= total * (len(bounds) + 1):
+            bounds.append((first, i + 1))
+            first = i + 1
+    if first < len(regions):
+        bounds.append((first, len(regions)))
+    return bounds
+
+
+"""
+Задание процесса-исполнителя: области подряд идущих методов и методы класса,
+объявленные до первой из них, движок лексера, нужно ли дерево и счетчики. Каждый разобранный
+метод объявляет себя сам, как при полном разборе. Возвращает (дерево
+NodeProgram из методов куска в формате AstSerializer или None, тексты методов
+на C#, TranslationStats куска или None) или None при любой ошибке.
+"""
+def _parse_chunk(job):
+    regions, declared, engine, tree, with_stats = job
+    stats = TranslationStats() if with_stats else None
+    symbols = SymbolTable() if stats is None else CountingSymbolTable(stats)
+    for _id, ret_type in declared:
+        symbols.declare(_id, ret_type, Symbol.METHOD)
+    methods = []
+    generated = []
+    for region in regions:
+        method = parse_method(region, symbols, engine, stats)
+        if method is None:
+            return None
+        methods.append(method)
+        with timer(stats, "codegen"):
+            generated.append(method.getGeneratedText())
+        if stats is not None:
+            stats.count_tree(method)
+    return AstSerializer.dumps(NodeProgram(methods)) if tree else None, generated, stats
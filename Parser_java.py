@@ -1,71 +1,210 @@
+import io
 import sys
+import math
 import operator
 
-from Lexer_java import Lexer, Token, help
-from SymbolTable import SymbolTable
+from Lexer_java import Lexer, Token, TokenStream, help, SyntaxError as LexerSyntaxError
+from SymbolTable import SymbolTable, Symbol
 from CodeGenerator import CodeGenerator
-from difflib import SequenceMatcher
-
-def similar(a, b):
-    return SequenceMatcher(None, a, b).ratio()
+from Suggestions import SuggestionIndex, max_distance
 
 
 class Node:
+    # Поля узла хранятся в __slots__ без __dict__; fields - их список в порядке
+    # объявления, по нему узел обходят печать дерева и другие обходчики
+    __slots__ = fields = ()
+
     def __init__(self, children):
         self.children = children
 
-    def __get_class_name(self):
-        c = str(self.__class__)
-        pos_1 = c.find('.') + 1
-        pos_2 = c.find("'", pos_1)
-        return f"{c[pos_1:pos_2]}"
+    # Свертка константы: литерал, которым можно заменить узел, или None
+    def fold(self):
+        return None
+
+    # Пары (поле, значение) в порядке fields; незаданные поля пропускаются
+    def items(self):
+        res = []
+        for name in self.fields:
+            try:
+                res.append((name, getattr(self, name)))
+            except AttributeError:
+                pass
+        return res
 
     def __repr__(self, level=0):
-        # словарь атрибут : значение
-        # если атрибут один и тип его значения - это список,
+        out = io.StringIO()
+        self.dump(out, level=level)
+        return out.getvalue()
+
+    """
+    Потоковая печать дерева в out (файл, sys.stdout, StringIO) в формате repr.
+    Дерево обходится явным стеком фрагментов за один проход: строка пишется
+    как есть, узел раскрывается в свои строки, список - как repr(list).
+    depth - сколько уровней вложенности печатать, более глубокие узлы
+    печатаются одним именем с "...". select - предикат на узел: если он задан,
+    печатаются только поддеревья с подходящими корнями (см. node_filter).
+    Отступ level получают только строки самого узла, у вложенных он нулевой.
+    """
+    def dump(self, out, depth=None, select=None, level=0):
+        if select is not None:
+            for node in self.find(select):
+                node.dump(out, depth, level=level)
+            return
+        # Фрагменты копятся в буфере и пишутся в out кусками
+        res = []
+        write = res.append
+        stack = [(self, 0)]
+        pop = stack.pop
+        extend = stack.extend
+        while stack:
+            item = pop()
+            if type(item) is str:
+                write(item)
+                if len(res) > 4096:
+                    out.write("".join(res))
+                    res.clear()
+                continue
+            item, d = item
+            if isinstance(item, Node):
+                if depth is not None and d > depth:
+                    write(f"{type(item).__name__} ...\n")
+                    continue
+                prefix = '|   ' * level + "|+-" if item is self else "|+-"
+                extend(reversed(item.__repr_parts(prefix, d + 1)))
+            elif isinstance(item, list):
+                parts = ["["]
+                for i, el in enumerate(item):
+                    if i:
+                        parts.append(", ")
+                    parts.append((el, d) if isinstance(el, (Node, list)) else repr(el))
+                parts.append("]")
+                extend(reversed(parts))
+            else:
+                write(repr(item))
+        out.write("".join(res))
+
+    # Узлы, подходящие под select, в порядке обхода дерева; внутрь найденных не заходит
+    def find(self, select):
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Node):
+                if select(item):
+                    yield item
+                    continue
+                stack.extend(reversed([value for _, value in item.items()]))
+            elif isinstance(item, list):
+                stack.extend(reversed(item))
+
+    # Строки узла для dump; дочерние узлы и списки - парами (значение, глубина),
+    # соседние строки склеены в один фрагмент
+    def __repr_parts(self, prefix, d):
+        # список пар поле : значение
+        # если поле одно и тип его значения - это список,
         # то это узел некоторой последовательности (подпрограмма, либо список)
-        attrs = self.__dict__
-        
-        if len(attrs) == 1 and isinstance(list(attrs.values())[0], list):
+        attrs = self.items()
+
+        if len(attrs) == 1 and isinstance(attrs[0][1], list):
             is_sequence = True
         else:
             is_sequence = False
-        res = f"{self.__get_class_name()}\n"
+        parts = []
+        text = type(self).__name__ + "\n"
         if is_sequence:
-            elements = list(attrs.values())[0]
-            for el in elements:
-                res += '|   ' * level
-                res += "|+-"
-                res += el.__repr__()
+            for el in attrs[0][1]:
+                text += prefix
+                if isinstance(el, (Node, list)):
+                    parts.append(text)
+                    parts.append((el, d))
+                    text = ""
+                else:
+                    text += repr(el)
         else:
-            for attr_name in attrs:
-                res += '|   ' * level
-                res += "|+-"
-                if isinstance(attrs[attr_name], Token):
-                    res += f"{attr_name}: {attrs[attr_name]}\n"
+            for attr_name, value in attrs:
+                if isinstance(value, Token):
+                    text += f"{prefix}{attr_name}: {value}\n"
+                elif isinstance(value, (Node, list)):
+                    parts.append(text + prefix + attr_name + ": ")
+                    parts.append((value, d))
+                    text = ""
                 else:
-                    res += f"{attr_name}: {attrs[attr_name].__repr__()}"
-        return res
+                    text += prefix + attr_name + ": " + repr(value)
+        if text:
+            parts.append(text)
+        return parts
+
+    """
+    Генерация кода на C# с записью прямо в out (StringIO, файл). Составные узлы
+    (NodeCompound) перечисляют в parts() фрагменты своего текста - строки и
+    дочерние узлы, которые раскрываются явным стеком, а не рекурсией, поэтому
+    глубина вложенности блоков и выражений не упирается в предел рекурсии.
+    Листья (литералы, переменные, объявления) пишутся одной строкой getGeneratedText.
+    """
+    def emit(self, out):
+        self.walk(out.write)
+
+    def walk(self, write):
+        stack = [self]
+        pop = stack.pop
+        extend = stack.extend
+        while stack:
+            item = pop()
+            if type(item) is str:
+                write(item)
+            elif isinstance(item, NodeCompound):
+                extend(item.parts()[::-1])
+            else:
+                write(item.getGeneratedText())
 
 
-class NodeProgram(Node):
-    headerProgram = ""
+# Предикат для Node.dump и Node.find: узел с таким именем класса или с таким id
+# (метод, переменная), например node_filter("main") или node_filter("NodeIfConstruction")
+def node_filter(name):
+    return lambda node: node.__class__.__name__ == name or getattr(node, "id", None) == name
+
+
+class NodeCompound(Node):
+    # Узел с дочерними узлами (блоки инструкций, операции): его текст собирается
+    # обходом walk, а не рекурсивными вызовами getGeneratedText
+    __slots__ = ()
+
+    def getGeneratedText(self):
+        res = []
+        self.walk(res.append)
+        return "".join(res)
+
+
+class NodeProgram(NodeCompound):
+    # headerProgram задается только у программы через setHeader
+    __slots__ = fields = ("children", "headerProgram")
 
     def setHeader(self, header):
         self.headerProgram = header
 
-    def getGeneratedText(self):
-        s = ""
+    def parts(self):
+        # Подряд идущие простые инструкции склеиваются в один фрагмент
+        parts = []
+        run = ""
         for item in self.children:
-            s += item.getGeneratedText() + "\n"
-        return s
+            if isinstance(item, NodeCompound):
+                parts.append(run)
+                parts.append(item)
+                run = "\n"
+            else:
+                run += item.getGeneratedText() + "\n"
+        parts.append(run)
+        return parts
 
 
 class NodeBlock(NodeProgram):
-    pass
+    __slots__ = ()
+    # У блока нет заголовка - он печатается как последовательность инструкций
+    fields = ("children",)
 
 
 class NodeSystemOutPrint(Node):
+    __slots__ = fields = ("header", "expression")
+
     def __init__(self, header, expression):
         self.header = header
         self.expression = expression
@@ -75,6 +214,8 @@ class NodeSystemOutPrint(Node):
 
 
 class NodeDeclaration(Node):
+    __slots__ = fields = ("type", "id")
+
     def __init__(self, _type, _id):
         self.type = _type
         self.id = _id
@@ -84,6 +225,8 @@ class NodeDeclaration(Node):
 
 
 class NodeAssigning(Node):
+    __slots__ = fields = ("left_side", "right_side")
+
     def __init__(self, left_side, right_side):
         self.left_side = left_side
         self.right_side = right_side
@@ -92,7 +235,9 @@ class NodeAssigning(Node):
         return self.left_side.getGeneratedText() + " = " + self.right_side.getGeneratedText() + ";"
 
 
-class NodeMethod(Node):
+class NodeMethod(NodeCompound):
+    __slots__ = fields = ("access_mod", "ret_type", "id", "formal_params", "block")
+
     def __init__(self, access_mod, ret_type, _id, formal_params, block):
         self.access_mod = access_mod
         self.ret_type = ret_type
@@ -100,24 +245,28 @@ class NodeMethod(Node):
         self.formal_params = formal_params
         self.block = block
 
-    def getGeneratedText(self):
-        return self.access_mod.lower() + " " + \
-               self.ret_type.lower() + " " + \
-               self.id + "(" + self.formal_params.getGeneratedText() + ") " + \
-               "\n{\n" + self.block.getGeneratedText() + "}"
+    def parts(self):
+        return [self.access_mod.lower() + " " + self.ret_type.lower() + " " + self.id + "(" +
+                self.formal_params.getGeneratedText() + ") \n{\n", self.block, "}"]
 
 
 class NodeSequence(Node):
+    __slots__ = fields = ("members",)
+
     def __init__(self, members):
         self.members = members
 
 
 class NodeParams(Node):
+    __slots__ = fields = ("params",)
+
     def __init__(self, params):
         self.params = params
 
 
 class NodeFormalParams(NodeParams):
+    __slots__ = ()
+
     def getGeneratedText(self):
         s = ""
         for item in self.params:
@@ -126,6 +275,8 @@ class NodeFormalParams(NodeParams):
 
 
 class NodeActualParams(NodeParams):
+    __slots__ = ()
+
     def getGeneratedText(self):
         s = ""
         for item in self.params:
@@ -133,70 +284,86 @@ class NodeActualParams(NodeParams):
 
 
 class NodeElseBlock(NodeBlock):
-    pass
+    __slots__ = ()
 
 
-class NodeIfConstruction(Node):
+# Блок в фигурных скобках без заголовка: так остается ветка со своими объявлениями,
+# когда Optimizer убирает вокруг нее условие
+class NodeScope(NodeCompound):
+    __slots__ = fields = ("block",)
+
+    def __init__(self, block):
+        self.block = block
+
+    def parts(self):
+        return ["{\n", self.block, "}\n"]
+
+
+class NodeIfConstruction(NodeCompound):
+    __slots__ = fields = ("condition", "block", "else_block")
+
     def __init__(self, condition, block, else_block=None):
         self.condition = condition
         self.block = block
         self.else_block = else_block
 
-    def getGeneratedText(self):
-        if self.else_block is None:
-            return "if (" + self.condition.getGeneratedText() + ") " + \
-                   " {\n" + self.block.getGeneratedText() + "}\n"
-        else:
-            return "if (" + self.condition.getGeneratedText() + ") " + \
-                   " {\n" + self.block.getGeneratedText() + "}\n" + \
-                   "else {\n" + self.else_block.getGeneratedText() + "}\n"
+    def parts(self):
+        parts = ["if (" + self.condition.getGeneratedText() + ")  {\n", self.block, "}\n"]
+        if self.else_block is not None:
+            parts += ["else {\n", self.else_block, "}\n"]
+        return parts
+
 
+class NodeWhileConstruction(NodeCompound):
+    __slots__ = fields = ("condition", "block")
 
-class NodeWhileConstruction(Node):
     def __init__(self, condition, block):
         self.condition = condition
         self.block = block
 
-    def getGeneratedText(self):
-        return "while (" + self.condition.getGeneratedText() + ") " + \
-               "{\n" + self.block.getGeneratedText() + "}"
+    def parts(self):
+        return ["while (" + self.condition.getGeneratedText() + ") {\n", self.block, "}"]
+
 
+class NodeSwitchConstruction(NodeCompound):
+    __slots__ = fields = ("tok", "cases", "blocks")
 
-class NodeSwitchConstruction(Node):
     def __init__(self, tok, cases: list, blocks: list):
         self.tok = tok
         self.cases = cases
         self.blocks = blocks
     
-    def getGeneratedText(self):
-        s = "switch (" + self.tok + ") {\n"
+    def parts(self):
+        parts = ["switch (" + self.tok + ") {\n"]
         for i in range(len(self.cases)):
-            s += "case " + self.cases[i].name + ":\n"
+            parts.append("case " + self.cases[i].name + ":\n")
             if self.blocks[i] != "":
-                s += self.blocks[i].getGeneratedText()
-            s += "break;\n"
-        s += "default:\n"
+                parts.append(self.blocks[i])
+            parts.append("break;\n")
+        parts.append("default:\n")
         if self.blocks[len(self.blocks) - 1] != "":
-            s += self.blocks[len(self.blocks) - 1].getGeneratedText()
-        s += "break;\n" + "}\n"
-        return s
+            parts.append(self.blocks[len(self.blocks) - 1])
+        parts.append("break;\n}\n")
+        return parts
             
 
-class NodeForConstruction(Node):
+class NodeForConstruction(NodeCompound):
+    __slots__ = fields = ("var_declr", "expr", "incr", "block")
+
     def __init__(self, variable_declarator, expression, increment, block):
         self.var_declr = variable_declarator
         self.expr = expression
         self.incr = increment
         self.block = block
 
-    def getGeneratedText(self):
-        return "for (" + self.var_declr.getGeneratedText() + \
-               self.expr.getGeneratedText() + ";" + \
-               self.incr.getGeneratedText() + ") {\n" + \
-               self.block.getGeneratedText() + "}"
+    def parts(self):
+        return ["for (" + self.var_declr.getGeneratedText() + self.expr.getGeneratedText() + ";" +
+                self.incr.getGeneratedText() + ") {\n", self.block, "}"]
 
 
 class NodeReturnStatement(Node):
+    __slots__ = fields = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -205,6 +372,8 @@ class NodeReturnStatement(Node):
 
 
 class NodeLiteral(Node):
+    __slots__ = fields = ("type", "value")
+
     def __init__(self, value, _type=None):
         self.type = _type
         self.value = value
@@ -216,23 +385,161 @@ class NodeLiteral(Node):
 
 
 class NodeStringLiteral(NodeLiteral):
+    __slots__ = ()
+
     def getGeneratedText(self):
         return '"' + self.value + '"'
 
 
 class NodeIntLiteral(NodeLiteral):
-    pass
+    __slots__ = ()
+
+    # C# читает 010 как десятичное 10, поэтому восьмеричный литерал заменяется своим значением
+    def fold(self):
+        if self.type is None or not is_octal(self.value.lstrip("-")):
+            return None
+        return make_literal(literal_value(self))
 
 
 class NodeFloatLiteral(NodeLiteral):
-    pass
+    __slots__ = ()
 
 
 class NodeBooleanLiteral(NodeLiteral):
-    pass
+    __slots__ = ()
+
+
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+# Значение литерала для свертки: int, float, bool или str; None - узел не константа
+def literal_value(node):
+    if not isinstance(node, NodeLiteral) or node.type is None:
+        return None
+    cls = type(node)
+    if cls is NodeIntLiteral:
+        digits = node.value.lstrip("-")
+        if not digits.isdigit():
+            return None
+        if is_octal(digits):
+            # Восьмеричный литерал покрывает все 32 бита: 037777777777 - это -1
+            if "8" in digits or "9" in digits:
+                return None
+            value = java_int(int(digits, 8))
+            return java_int(-value) if node.value.startswith("-") else value
+        value = int(node.value)
+        return value if INT_MIN <= value <= INT_MAX else None
+    if cls is NodeFloatLiteral:
+        try:
+            return float(node.value)
+        except ValueError:
+            return None
+    if cls is NodeBooleanLiteral:
+        return {"true": True, "false": False}.get(node.value)
+    if cls is NodeStringLiteral:
+        return node.value
+    return None
+
+
+# Ведущий ноль в Java - восьмеричная запись: 010 - это 8
+def is_octal(digits):
+    return digits[0] == "0" and digits != "0"
+
+
+# Литерал для результата свертки; None - значение не записать литералом (бесконечность, NaN)
+def make_literal(value):
+    if value is None:
+        return None
+    if type(value) is bool:
+        return NodeBooleanLiteral("true" if value else "false", "boolean")
+    if type(value) is int:
+        return NodeIntLiteral(str(value), "int")
+    if type(value) is float:
+        return NodeFloatLiteral(repr(value), "double") if math.isfinite(value) else None
+    return NodeStringLiteral(value, "string")
+
+
+# Приведение к 32-битному int Java: переполнение заворачивается
+def java_int(value):
+    return (value - INT_MIN) % 2 ** 32 + INT_MIN
+
+
+def _is_number(value):
+    return type(value) is int or type(value) is float
+
+
+"""
+Арифметика Java: int с int считается в 32 битах с переполнением, если
+хотя бы один операнд double - в double. int_op и float_op возвращают None,
+когда результат не записать литералом (деление на ноль).
+"""
+def java_arith(a, b, int_op, float_op):
+    if not (_is_number(a) and _is_number(b)):
+        return None
+    if type(a) is int and type(b) is int:
+        value = int_op(a, b)
+        return None if value is None else java_int(value)
+    return float_op(float(a), float(b))
+
+
+# Целочисленное деление Java - с отбрасыванием дробной части (к нулю), а не вниз
+def _int_div(a, b):
+    if b == 0:
+        return None
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+# Остаток Java - со знаком делимого
+def _int_mod(a, b):
+    if b == 0:
+        return None
+    r = abs(a) % abs(b)
+    return r if a >= 0 else -r
+
+
+def _float_div(a, b):
+    return a / b if b else None
+
+
+def _float_mod(a, b):
+    return math.fmod(a, b) if b else None
+
+
+def java_string(value):
+    if type(value) is bool:
+        return "true" if value else "false"
+    return str(value)
+
+
+# + в Java: склейка, если один из операндов строка, иначе сложение
+def java_plus(a, b):
+    if type(a) is str or type(b) is str:
+        # double Java переводит в строку иначе, чем Python, - такую склейку не сворачиваем
+        if type(a) is float or type(b) is float:
+            return None
+        return java_string(a) + java_string(b)
+    return java_arith(a, b, operator.add, operator.add)
+
+
+def java_compare(a, b, op):
+    if not (_is_number(a) and _is_number(b)):
+        return None
+    return op(a, b)
+
+
+# == в Java: числа сравниваются по значению, boolean - между собой, строки - по ссылке (не сворачиваем)
+def java_equals(a, b):
+    if _is_number(a) and _is_number(b):
+        return a == b
+    if type(a) is bool and type(b) is bool:
+        return a == b
+    return None
 
 
 class NodeVar(Node):
+    __slots__ = fields = ("id", "type")
+
     def __init__(self, _id, _type):
         self.id = _id
         self.type = _type
@@ -242,6 +549,8 @@ class NodeVar(Node):
 
 
 class NodeAtomType(Node):
+    __slots__ = fields = ("id",)
+
     def __init__(self, _id):
         self.id = _id
 
@@ -250,32 +559,50 @@ class NodeAtomType(Node):
 
 
 class NodeComplexType(Node):
+    __slots__ = fields = ("id", "size")
+
     def __init__(self, _id, size):
         self.id = _id
         self.size = size
 
 
 class NodeFunctionCall(Node):
+    __slots__ = fields = ("id", "actual_params")
+
     def __init__(self, _id, actual_params):
         self.id = _id
         self.actual_params = actual_params
 
 
 class NodeIndexAccess(Node):
+    __slots__ = fields = ("var", "index")
+
     def __init__(self, var, index):
         self.var = var
         self.index = index
 
 
-class NodeUnaryOperator(Node):
+class NodeUnaryOperator(NodeCompound):
+    __slots__ = fields = ("operand",)
+
     def __init__(self, operand):
         self.operand = operand
 
-    def getGeneratedText(self):
-        return self.operand.getGeneratedText()
+    def parts(self):
+        return [self.operand]
+
+    # Значение операции Java над значением литерала; None - не сворачивается
+    def evaluate(self, value):
+        return None
+
+    def fold(self):
+        value = literal_value(self.operand)
+        return None if value is None else make_literal(self.evaluate(value))
 
 
 class NodeIncrement(Node):
+    __slots__ = fields = ("id",)
+
     def __init__(self, _id):
         self.id = _id
 
@@ -284,159 +611,230 @@ class NodeIncrement(Node):
 
 
 class NodeUnaryMinus(NodeUnaryOperator):
-    def getGeneratedText(self):
-        return "-" + self.operand.getGeneratedText()
+    __slots__ = ()
+
+    def parts(self):
+        return ["-", self.operand]
+
+    def evaluate(self, value):
+        if type(value) is int:
+            return java_int(-value)
+        if type(value) is float:
+            return -value
+        return None
 
 
 class NodeNot(NodeUnaryOperator):
-    def getGeneratedText(self):
-        return "!" + self.operand.getGeneratedText()
-
-
-class NodeBinaryOperator(Node):
-    ops = {
-        "+": operator.add,
-        "-": operator.sub,
-        "*": operator.mul,
-        "/": operator.truediv,
-        "%": operator.mod,
-        "==": operator.eq,
-        "!": operator.neg,
-        "&&": operator.and_,
-        "||": operator.or_,
-        "<": operator.ge,
-        ">": operator.gt
-    }
+    __slots__ = ()
+
+    def parts(self):
+        return ["!", self.operand]
+
+    def evaluate(self, value):
+        return not value if type(value) is bool else None
+
+
+class NodeBinaryOperator(NodeCompound):
+    __slots__ = fields = ("left", "right", "operator")
 
     def __init__(self, left, right, operator=""):
         self.left = left
         self.right = right
         self.operator = operator
 
-    def getGeneratedText(self):
-        #if isinstance(self.left, NodeLiteral) and isinstance(self.right, NodeLiteral):
-        #    if self.left.type == "int":
-        #        return str(self.ops[self.operator](int(self.left.value), int(self.right.value)))
-        #    elif self.left.type == "double":
-        #        return str(self.ops[self.operator](float(self.left.value), float(self.right.value)))
-        #else:
-        return "(" + self.left.getGeneratedText() + " " + \
-                self.operator + " " + self.right.getGeneratedText() + ")"
+    def parts(self):
+        return ["(", self.left, " " + self.operator + " ", self.right, ")"]
+
+    # Значение операции Java над значениями литералов (см. literal_value); None - не сворачивается
+    def evaluate(self, a, b):
+        return None
+
+    def fold(self):
+        a = literal_value(self.left)
+        if a is None:
+            return None
+        b = literal_value(self.right)
+        if b is None:
+            return None
+        return make_literal(self.evaluate(a, b))
 
 
 class NodeL(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "<"
 
+    def evaluate(self, a, b):
+        return java_compare(a, b, operator.lt)
+
 
 class NodeG(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = ">"
 
+    def evaluate(self, a, b):
+        return java_compare(a, b, operator.gt)
+
 
 class NodeLE(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "<="
 
+    def evaluate(self, a, b):
+        return java_compare(a, b, operator.le)
+
 
 class NodeGE(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = ">="
 
+    def evaluate(self, a, b):
+        return java_compare(a, b, operator.ge)
+
 
 class NodeEQ(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "=="
 
+    def evaluate(self, a, b):
+        return java_equals(a, b)
+
 
 class NodeNEQ(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "!="
 
+    def evaluate(self, a, b):
+        equal = java_equals(a, b)
+        return None if equal is None else not equal
+
 
 class NodeOr(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "||"
 
+    def evaluate(self, a, b):
+        return a or b if type(a) is bool and type(b) is bool else None
+
 
 class NodeAnd(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "&&"
 
+    def evaluate(self, a, b):
+        return a and b if type(a) is bool and type(b) is bool else None
+
 
 class NodePlus(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "+"
 
+    def evaluate(self, a, b):
+        return java_plus(a, b)
+
 
 class NodeMinus(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "-"
 
+    def evaluate(self, a, b):
+        return java_arith(a, b, operator.sub, operator.sub)
+
 
 class NodeDivision(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "/"
 
+    def evaluate(self, a, b):
+        return java_arith(a, b, _int_div, _float_div)
+
 
 class NodeMultiply(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "*"
 
+    def evaluate(self, a, b):
+        return java_arith(a, b, operator.mul, operator.mul)
+
 
 class NodeIDivision(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "//"
 
+    def evaluate(self, a, b):
+        # Целочисленное деление - только для int
+        return java_arith(a, b, _int_div, lambda a, b: None)
+
 
 class NodeMod(NodeBinaryOperator):
+    __slots__ = ()
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
         self.operator = "%"
 
+    def evaluate(self, a, b):
+        return java_arith(a, b, _int_mod, _float_mod)
 
-class Parser:
-    ops = {
-        "+": operator.add,
-        "-": operator.sub,
-        "*": operator.mul,
-        "/": operator.truediv,
-        "%": operator.mod,
-        "==": operator.eq,
-        "!": operator.neg,
-        "&&": operator.and_,
-        "||": operator.or_,
-        "<": operator.ge,
-        ">": operator.gt
-    }
 
+# Ключевые слова для подсказок - индекс строится один раз на все парсеры и раскладывается
+# сразу при импорте: его читают парсеры из разных потоков (translate_many, сервер)
+KEYWORDS = SuggestionIndex(list(help.ACCESS_MODIFIERS) + list(help.KEY_WORDS) + list(help.DATA_TYPES)).expand()
+
+
+class Parser:
     typeNode = {
         "+": NodePlus,
         "-": NodeMinus,
@@ -454,19 +852,60 @@ class Parser:
         "string": NodeStringLiteral
     }
 
-    def __init__(self, lexer: Lexer):
-        self.lexer = lexer
-        self.token = self.lexer.get_next_token()
-        self.symbolTable = list()
-        self.symbolTable.append(SymbolTable())
+    # Операции уровней term и sum в разборе выражения
+    TERM_OPS = {"*", "/", "<", ">", "==", "&&"}
+    SUM_OPS = {"+", "-", "||"}
+    BOOLEAN_OPS = (NodeL, NodeG, NodeLE, NodeGE, NodeEQ, NodeNEQ, NodeAnd, NodeOr)
+    # Возвращается operand на открывающей скобке вложенного выражения
+    GROUP = object()
+
+    # Токены, на которых заканчивается пропуск текста после ошибки
+    SYNC_TOKENS = {";", "}", "break", "if", "for", "while", "switch",
+                   "System.out.print", "System.out.println", *help.DATA_TYPES, *help.ACCESS_MODIFIERS}
+
+    # out - куда печатать сообщение об ошибке (по умолчанию sys.stdout).
+    # Свой поток на каждый парсер нужен, чтобы не подменять sys.stdout при работе в потоках.
+    # recover - не останавливаться на первой ошибке, а собирать все в self.diagnostics
+    def __init__(self, lexer: Lexer, out=None, recover=False):
+        # Лексер без своего заглядывания вперед (все, кроме TokenBuffer) читается через TokenStream
+        self.lexer = lexer if hasattr(lexer, "peek") else TokenStream(lexer)
+        self.out = out
+        self.recover = recover
+        self.diagnostics = Diagnostics()
+        self.symbolTable = SymbolTable()
+        self.next_token()
 
     def next_token(self):
-        self.token = self.lexer.get_next_token()
+        while True:
+            try:
+                self.token = self.lexer.get_next_token()
+                return
+            except LexerSyntaxError as e:
+                if not self.recover:
+                    raise
+                # Лексер уже сдвинулся за ошибочную лексему - просто берем следующую
+                self.diagnostics.add(str(e), e.line, e.pos)
 
     def error(self, msg):
-        print(f'Ошибка синтаксического анализа: {msg}')
+        if self.recover:
+            self.diagnostics.add(msg, self.lexer.lineno, self.lexer.position)
+            raise PanicMode(msg)
+        print(f'Ошибка синтаксического анализа: {msg}', file=self.out)
         sys.exit(1)
 
+    # Восстановление после ошибки: закрываем открытые при разборе области видимости
+    # и пропускаем токены до ';' (включительно), '}' или начала следующей инструкции
+    def synchronize(self, depth, start):
+        while self.symbolTable.depth > depth:
+            self.symbolTable.pop()
+        # Если ошибка случилась прямо на первом токене, пропускаем его, чтобы не зациклиться
+        if self.token is start and self.token.value != "EOF":
+            self.next_token()
+        while self.token.name not in Parser.SYNC_TOKENS and self.token.value != "EOF":
+            self.next_token()
+        if self.token.name == ";":
+            self.next_token()
+
     def operand(self, _type) -> Node:
         first_token = self.token
 
@@ -490,12 +929,9 @@ class Parser:
         # переменная, функция или массив.
         elif self.token.value == "ID":
             # Проверяем есть переменная в таблице символов, т.е. объявлена ли она
-            f = False
-            for table in self.symbolTable:
-                if self.token.name in table.table:
-                    f = True
-            if not f:
-                self.error(SemanticErrors.UnknowingIdentifier(self.token.name, self.lexer.lineno, self.lexer.position, "variable"))
+            if not self.symbolTable.isExist(self.token.name):
+                expectedWord = self.findExpectedWord(self.token.name, keywords=False) or "variable"
+                self.error(SemanticErrors.UnknowingIdentifier(self.token.name, self.lexer.lineno, self.lexer.position, expectedWord))
             # Берем следующий токен
             self.next_token()
             # Если следующий токен это (, то значит операндом является функция
@@ -510,86 +946,154 @@ class Parser:
                     return NodeAtomType(first_token.name)
                 else:
                     return NodeVar(first_token.name, first_token.value.lower())
-        # Если операндом является (, то значит мы встретили скобку в выражении
-        # и должны продолжить разбор выражения, но уже в скобках.
+        # Если операндом является (, то значит мы встретили скобку в выражении.
+        # Разбор выражения в скобках продолжает expression на своем стеке,
+        # здесь скобка не съедается.
         elif self.token.name == "(":
-            self.next_token()
-            expression = self.expression(_type)
-            self.next_token()
-            return expression
-
-    # Этот метод определяет, есть ли у операнда унарный минус или нет.
-    # А также начинает сам разбор операнда.
-    def factor(self, _type) -> Node:
-        if self.token.name == "-":
-            self.next_token()
-            return NodeUnaryMinus(self.operand(_type))
-        elif self.token.name == "!":
-            self.next_token()
-            return NodeNot(self.operand(_type))
-        else:
-            return self.operand(_type)
+            return Parser.GROUP
 
     # Этот метод обрабатывает арифметическое выражение.
     # А именно выражение с операциями "*", "/", "<", ">", "==", "&&".
-    def term(self, _type) -> Node:
-        left = self.factor(_type)
-        op = self.token.name
-
-        while op in {"*", "/", "<", ">", "==", "&&"}:
-            self.next_token()
-            right = self.factor(_type)
-            if isinstance(left, NodeLiteral) and isinstance(right, NodeLiteral):
-                if _type == "int":
-                    if op == "&&":
-                        self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
-                    left = self.typeNode[_type](str(self.ops[op](int(left.value), int(right.value))), _type)
-                elif _type == "double":
-                    if op == "&&":
-                        self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
-                    left = self.typeNode[_type](str(self.ops[op](float(left.value), float(right.value))), _type)
-                elif _type == "boolean":
-                    left = self.typeNode[op](left, right)
-                else:
+    # Два литерала в выражении типа int или double сразу сворачиваются (Node.fold),
+    # остальное сворачивает Optimizer.fold_constants после разбора.
+    def term_operation(self, left, op, right, _type) -> Node:
+        node = self.typeNode[op](left, right)
+        if isinstance(left, NodeLiteral) and isinstance(right, NodeLiteral):
+            if _type == "int" or _type == "double":
+                if op == "&&":
                     self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
-            else:
-                left = self.typeNode[op](left, right)
-            op = self.token.name
-        return left
+                return Parser.folded(node)
+            elif _type != "boolean":
+                self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
+        return node
 
     # Этот метод обрабатывает арифметические выражения.
     # А именно выражения с операциями "+", "-", "||".
-    def expression(self, _type) -> Node:
-        left = self.term(_type)
-        op = self.token.name
-
-        while op in {"+", "-", "||"}:
-            self.next_token()
-            right = self.term(_type)
-            if isinstance(left, NodeLiteral) and isinstance(right, NodeLiteral):
-                if _type == "int":
-                    if op != "||":
-                        left = self.typeNode[_type](str(self.ops[op](int(left.value), int(right.value))), _type)
-                    else:
-                        self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
-                elif _type == "double":
-                    if op != "||":
-                        left = self.typeNode[_type](str(self.ops[op](float(left.value), float(right.value))), _type)
-                    else:
-                        self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
-                elif _type == "string":
-                    if op == "+":
-                        left = self.typeNode[_type](str(self.ops[op](left.value, right.value)), _type)
-                    else:
-                        self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
-                elif _type == "boolean":
-                    left = self.typeNode[op](left, right)
-                else:
+    def expression_operation(self, left, op, right, _type) -> Node:
+        node = self.typeNode[op](left, right)
+        if isinstance(left, NodeLiteral) and isinstance(right, NodeLiteral):
+            if _type == "int" or _type == "double":
+                if op == "||":
+                    self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
+                return Parser.folded(node)
+            elif _type == "string":
+                if op != "+":
                     self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
+                return Parser.folded(node)
+            elif _type != "boolean":
+                self.error(SemanticErrors.InvalidOperation(self.lexer.lineno, self.lexer.position))
+        return node
+
+    @staticmethod
+    def folded(node):
+        literal = node.fold()
+        return node if literal is None else literal
+
+    """
+    Разбор выражения без рекурсии. Грамматика прежняя:
+        <expression> ::= <term> { ("+" | "-" | "||") <term> }
+        <term>       ::= <factor> { ("*" | "/" | "<" | ">" | "==" | "&&") <factor> }
+        <factor>     ::= ["-" | "!"] <operand>
+        <operand>    ::= <literal> | <id> | "(" <expression> ")"
+    Для каждой открытой скобки состояние уровней expression и term (левый
+    операнд и ожидающая операция) кладется на явный стек и снимается после
+    закрывающей скобки, так что глубина скобок ограничена только памятью.
+    """
+    def expression(self, _type) -> Node:
+        frames = []
+        left_sum = sum_op = left_term = term_op = None
+        while True:
+            # <factor>: унарный минус или отрицание перед операндом
+            unary = None
+            if self.token.name == "-":
+                self.next_token()
+                unary = NodeUnaryMinus
+            elif self.token.name == "!":
+                self.next_token()
+                unary = NodeNot
+            node = self.operand(_type)
+            if node is Parser.GROUP:
+                # Пропускаем ( и начинаем выражение в скобках с чистого состояния
+                self.next_token()
+                frames.append((unary, left_sum, sum_op, left_term, term_op))
+                left_sum = sum_op = left_term = term_op = None
+                continue
+            while True:
+                if unary is not None:
+                    node = unary(node)
+                left_term = node if term_op is None else self.term_operation(left_term, term_op, node, _type)
+                term_op = self.token.name
+                if term_op in Parser.TERM_OPS:
+                    self.next_token()
+                    break
+                left_sum = left_term if sum_op is None else self.expression_operation(left_sum, sum_op, left_term, _type)
+                left_term = term_op = None
+                sum_op = self.token.name
+                if sum_op in Parser.SUM_OPS:
+                    self.next_token()
+                    break
+                if not frames:
+                    return left_sum
+                # Выражение в скобках закончено: пропускаем ) и возвращаемся к внешнему уровню
+                self.next_token()
+                node = left_sum
+                unary, left_sum, sum_op, left_term, term_op = frames.pop()
+
+    """
+    Тип значения выражения для проверки объявления: у литерала - его тип, у
+    переменной - тип из таблицы символов, у сравнений и логических операций -
+    boolean, у арифметики - общий тип операндов (int с double дает double,
+    + со строкой - строку). None - тип не вывести, и проверка пропускается.
+    Обход снизу вверх на явном стеке, как в expression: длина цепочки
+    a + a + ... ограничена только памятью.
+    """
+    def expression_type(self, node):
+        # Типы уже разобранных подвыражений: у операции на вершине - ее операнды
+        types = []
+        # (узел, посчитаны ли уже типы его операндов)
+        stack = [(node, False)]
+        while stack:
+            node, done = stack.pop()
+            if isinstance(node, NodeLiteral) and node.type is None:
+                # Обертка инициализатора объявления - тип у ее значения
+                stack.append((node.value, False))
+            elif not done and isinstance(node, NodeUnaryOperator):
+                stack.append((node, True))
+                stack.append((node.operand, False))
+            elif not done and isinstance(node, NodeBinaryOperator):
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            elif isinstance(node, NodeUnaryOperator):
+                operand = types.pop()
+                types.append("boolean" if isinstance(node, NodeNot) else operand)
+            elif isinstance(node, NodeBinaryOperator):
+                right = types.pop()
+                left = types.pop()
+                types.append(self.operation_type(node, left, right))
             else:
-                left = self.typeNode[op](left, right)
-            op = self.token.name
-        return left
+                types.append(self.operand_type(node))
+        return types[0]
+
+    def operand_type(self, node):
+        if isinstance(node, NodeLiteral):
+            return node.type
+        if isinstance(node, NodeAtomType):
+            symbol = self.symbolTable.lookup(node.id)
+            return symbol.type if symbol is not None else None
+        return None
+
+    @staticmethod
+    def operation_type(node, left, right):
+        if isinstance(node, Parser.BOOLEAN_OPS):
+            return "boolean"
+        if left is None or right is None:
+            return None
+        if isinstance(node, NodePlus) and "string" in (left.lower(), right.lower()):
+            return left if left.lower() == "string" else right
+        if left == right:
+            return left
+        return "double" if {left, right} == {"int", "double"} else None
 
     # Этот метод обрабатывает пары токенов вида: <type> <id>
     # или вида: <type> <id> = <right_side>
@@ -602,11 +1106,7 @@ class Parser:
             # Если объявлена, то выкидываем ошибку.
             #if self.symbolTable[len(self.symbolTable) - 1].isExist(self.token.name)
                 #self.error(SemanticErrors.AlreadyDeclared())
-            f = False
-            for table in self.symbolTable:
-                if self.token.name in table.table:
-                    f = True
-            if f:
+            if self.symbolTable.isExist(self.token.name):
                 self.error(SemanticErrors.AlreadyDeclared(self.lexer.lineno, self.lexer.position))
             # Сохраняем id переменной
             _id = self.token.name
@@ -616,17 +1116,18 @@ class Parser:
                 self.next_token()
                 if self.token.value.lower() in help.DATA_TYPES or self.token.value == "ID":
                     # Добавляем переменную в таблицу символов
-                    self.symbolTable[len(self.symbolTable) - 1].table[_id] = data_type
+                    self.symbolTable.declare(_id, data_type)
 
                     left_side = NodeDeclaration(data_type, _id)
                     right_side = NodeIntLiteral(self.expression(data_type))
-                    if left_side.type != right_side.value.type:
+                    init_type = self.expression_type(right_side.value)
+                    if init_type is not None and left_side.type != init_type:
                         self.error(SyntaxErrors.DeclarationError(self.lexer.lineno, self.lexer.position))
 
 
                     return NodeAssigning(left_side, right_side)
             # Добавляем переменную в таблицу символов
-            self.symbolTable[len(self.symbolTable) - 1].table[_id] = data_type
+            self.symbolTable.declare(_id, data_type)
             return NodeDeclaration(data_type, _id)
         # Обрабатываем объявление массивов.
         elif self.token.name == "[":
@@ -656,31 +1157,71 @@ class Parser:
         return NodeIncrement(_id)
 
 
+    """
+    Разбор операторов без рекурсии Python. _block и _local_statement - генераторы:
+    вложенный блок или оператор они не вызывают, а отдают (yield) его генератор,
+    и _run кладет его на явный стек, а результат возвращает обратно через send.
+    PanicMode из вложенного разбора бросается в родителя через throw на месте
+    yield - восстановление в _block работает как при обычных вызовах. Глубина
+    вложенных if/while/for/switch ограничена только памятью.
+    """
+    def _run(self, steps):
+        stack = [steps]
+        value = error = None
+        while True:
+            try:
+                child = stack[-1].send(value) if error is None else stack[-1].throw(error)
+            except StopIteration as e:
+                stack.pop()
+                value, error = e.value, None
+                if not stack:
+                    return value
+                continue
+            except Exception as e:
+                stack.pop()
+                if not stack:
+                    raise
+                value, error = None, e
+                continue
+            stack.append(child)
+            value = error = None
+
     def block(self) -> Node:
-        #  Добавляем локальную таблицу символов
-        self.symbolTable.append(SymbolTable())
+        return self._run(self._block())
+
+    def _block(self):
+        #  Открываем локальную область видимости
+        self.symbolTable.push()
 
+        depth = self.symbolTable.depth
         statements = []
         while self.token.name not in {"}", "break"}:
-            statements.append(self.local_statement())
+            start = self.token
+            try:
+                statements.append((yield self._local_statement()))
 
-            if isinstance(statements[len(statements) - 1], NodeIfConstruction) or\
-                isinstance(statements[len(statements) - 1], NodeWhileConstruction) or\
-                isinstance(statements[len(statements) - 1], NodeSwitchConstruction) or\
-                isinstance(statements[len(statements) - 1], NodeForConstruction):
-                continue
+                if isinstance(statements[len(statements) - 1], NodeIfConstruction) or\
+                    isinstance(statements[len(statements) - 1], NodeWhileConstruction) or\
+                    isinstance(statements[len(statements) - 1], NodeSwitchConstruction) or\
+                    isinstance(statements[len(statements) - 1], NodeForConstruction):
+                    continue
 
-            if self.token.name != ";":
-                self.error(SyntaxErrors.MissingSpecSymbol(";", self.lexer.lineno, self.lexer.position))
-            self.next_token()
-        # Удаляем локальную таблицу символов
+                if self.token.name != ";":
+                    self.error(SyntaxErrors.MissingSpecSymbol(";", self.lexer.lineno, self.lexer.position))
+                self.next_token()
+            except PanicMode:
+                self.synchronize(depth, start)
+                # Конец файла или начало следующего метода - блок не закрыт, дальше разберется statement
+                if self.token.value == "EOF" or self.token.name in help.ACCESS_MODIFIERS:
+                    break
+        # Закрываем локальную область видимости
         self.symbolTable.pop()
         return NodeBlock(statements)
 
     # При вызове функции мы уже смотрим на следующий токен
     def formal_params(self) -> Node:
-        # Добавляем локальную для метода таблицу символов
-        self.symbolTable.append(SymbolTable())
+        # Открываем локальную для метода область видимости
+        self.symbolTable.push()
         params = []
         while self.token.name not in {")"}:
             # В params надо добавлять два токена: <type> и <id>.
@@ -690,13 +1231,16 @@ class Parser:
                 self.error(SyntaxErrors.MissingSpecSymbol(",", self.lexer.lineno, self.lexer.position))
             if self.token.name == ",":
                 self.next_token()
-        # Добавляем локальную таблицу символов аргументы функции
+        # Отмечаем в таблице символов аргументы функции
         for i in params:
-            self.symbolTable[len(self.symbolTable) - 1].table[i.id] = i.type
+            self.symbolTable.declare(i.id, i.type, Symbol.PARAMETER)
         self.next_token()
         return NodeFormalParams(params)
 
     def local_statement(self) -> Node:
+        return self._run(self._local_statement())
+
+    def _local_statement(self):
         # Обрабатываем объявление переменных и массивов.
         # Их грамматики:
         # переменные: <type> <id> =? <right_side>?;
@@ -708,12 +1252,8 @@ class Parser:
             id = self.token
             
             # Проверяем на существование переменной
-            f = False
-            for table in self.symbolTable:
-                if self.token.name in table.table:
-                    f = True
-            if not f:
-                expectedWord = self.findExpectedWord(self.token.name)
+            if not self.symbolTable.isExist(self.token.name):
+                expectedWord = self.findExpectedWord(self.token.name) or "variable"
                 self.error(SemanticErrors.UnknowingIdentifier(self.token.name, self.lexer.lineno, self.lexer.position, expectedWord))
             
             self.next_token()
@@ -724,10 +1264,8 @@ class Parser:
             self.next_token()
 
             #  Находим тип переменной
-            tp = ""
-            for table in self.symbolTable:
-                if id.name in table.table:
-                    tp = table.table[id.name]
+            symbol = self.symbolTable.lookup(id.name)
+            tp = symbol.type if symbol is not None else ""
 
             #  Разбираем правую часть
             right = self.expression(tp)
@@ -761,7 +1299,7 @@ class Parser:
             self.next_token()
 
             #  Начинаем разбор тела условия
-            block = self.block()
+            block = yield self._block()
 
             # Проверяем наличие }
             if self.token.name != "}":
@@ -782,7 +1320,7 @@ class Parser:
             self.next_token()
 
             #  Начинаем разбор тела условия
-            else_block = self.block()
+            else_block = yield self._block()
 
             # Проверяем наличие }
             if self.token.name != "}":
@@ -803,7 +1341,7 @@ class Parser:
             self.next_token()
 
             # Начинаем разбор <variable declarator>
-            variable_declarator = self.local_statement()
+            variable_declarator = yield self._local_statement()
 
             #  Проверяем наличие ;
             if self.token.name != ";":
@@ -839,7 +1377,7 @@ class Parser:
             #  Пропускаем {
             self.next_token()
 
-            block = self.block()
+            block = yield self._block()
 
             # Проверяем наличие }
             if self.token.name != "}":
@@ -876,7 +1414,7 @@ class Parser:
             self.next_token()
 
             #  Начинаем разбор тела условия
-            block = self.block()
+            block = yield self._block()
 
             # Проверяем наличие }
             if self.token.name != "}":
@@ -915,12 +1453,11 @@ class Parser:
             
             t = ""
             if self.token.value == "ID":
-                for table in self.symbolTable:
-                    if self.token.name in table.table:
-                        t = table.table[self.token.name]
-                        break
+                symbol = self.symbolTable.lookup(self.token.name)
+                if symbol is not None:
+                    t = symbol.type
             else:
-                t = self.token.value
+                t = self.token.value.lower()
             self.next_token()
             
             #  Проверяем наличие )
@@ -959,7 +1496,7 @@ class Parser:
                 
                 # Разбор тела case
                 if self.token.name != "break":
-                    blocks.append(self.block())
+                    blocks.append((yield self._block()))
                 else:
                     blocks.append("")
                 
@@ -986,7 +1523,7 @@ class Parser:
             
             # Разбор тела default
             if self.token.name != "break":
-                blocks.append(self.block())
+                blocks.append((yield self._block()))
             else:
                 blocks.append("")
             
@@ -1057,18 +1594,14 @@ class Parser:
             if self.token.value != "ID":
                 self.error(SyntaxErrors.MissingID(self.lexer.lineno, self.lexer.position))
             #  Проверяем не объявлен ли метод повторно
-            f = False
-            for table in self.symbolTable:
-                if self.token.name in table.table:
-                    f = True
-            if f:
+            if self.symbolTable.isExist(self.token.name):
                 self.error(SemanticErrors.AlreadyDeclared(self.lexer.lineno, self.lexer.position))
             # Сохраняем имя метода
             _id = self.token.name
             self.next_token()
 
             # Добавляем нашу функцию в таблицу символов
-            self.symbolTable[len(self.symbolTable) - 1].table[_id] = ret_type.lower()
+            self.symbolTable.declare(_id, ret_type.lower(), Symbol.METHOD)
 
             if self.token.name != "(":
                 self.error(SyntaxErrors.MissingSpecSymbol("(", self.lexer.lineno, self.lexer.position))
@@ -1086,7 +1619,7 @@ class Parser:
             # Начинаем разбор тела метода
             block = self.block()
 
-            #  Удаляем таблицу символов блока
+            #  Закрываем область видимости параметров метода
             self.symbolTable.pop()
 
             # Здесь должна быть проверка на наличие '}'
@@ -1098,7 +1631,10 @@ class Parser:
 
     def parse(self) -> Node:
         if self.lexer.state == Lexer.EOF:
-            self.error("File is empty!")
+            try:
+                self.error("File is empty!")
+            except PanicMode:
+                return NodeProgram([])
         else:
             statements = []
             header = ""  # Для заголовка нашего класса
@@ -1107,53 +1643,97 @@ class Parser:
             потому что наш парсер поддерживает только один класс.
             В итоге наш разбор заканчивается на токене следующим за {.
             '''
-            if self.token.name not in help.ACCESS_MODIFIERS:
-                self.error(f"Missing access modifiers: public in line {self.lexer.lineno} on position {self.lexer.position}")
-            self.next_token()
-            if self.token.name not in help.KEY_WORDS:
-                self.error(f"Missing keyword: class in line {self.lexer.lineno} on position {self.lexer.position}")
-            # Запоминаем ключевое слово class
-            header += "class "
-            self.next_token()
-            if self.token.value != "ID":
-                self.error(SyntaxErrors.MissingID(self.lexer.lineno, self.lexer.position))
-            # Запоминаем название нашего класса
-            header += f"{self.token.name} "
-            self.next_token()
-            if self.token.name not in help.SPEC:
-                a = "{"
-                self.error(f"Expected '{a}' in line {self.lexer.lineno} on position {self.lexer.position}")
-            self.next_token()
+            start = self.token
+            try:
+                if self.token.name not in help.ACCESS_MODIFIERS:
+                    self.error(f"Missing access modifiers: public in line {self.lexer.lineno} on position {self.lexer.position}")
+                self.next_token()
+                if self.token.name not in help.KEY_WORDS:
+                    self.error(f"Missing keyword: class in line {self.lexer.lineno} on position {self.lexer.position}")
+                # Запоминаем ключевое слово class
+                header += "class "
+                self.next_token()
+                if self.token.value != "ID":
+                    self.error(SyntaxErrors.MissingID(self.lexer.lineno, self.lexer.position))
+                # Запоминаем название нашего класса
+                header += f"{self.token.name} "
+                self.next_token()
+                if self.token.name not in help.SPEC:
+                    a = "{"
+                    self.error(f"Expected '{a}' in line {self.lexer.lineno} on position {self.lexer.position}")
+                self.next_token()
+            except PanicMode:
+                self.skip_to_method(start)
             '''
             Потом разбираем остальные инструкции в теле нашего класса
             '''
             while self.lexer.state != Lexer.EOF:
-                statements.append(self.statement())
-                if self.token.name == "}":
-                    self.next_token()
+                start = self.token
+                try:
+                    statement = self.statement()
+                    # statement разбирает только методы - на любом другом токене он ничего не съедает
+                    if self.token is start:
+                        self.error(SyntaxErrors.UnexpectedToken(self.token.name, self.lexer.lineno, self.lexer.position))
+                    statements.append(statement)
+                    if self.token.name == "}":
+                        self.next_token()
+                except PanicMode:
+                    self.skip_to_method(start)
             nodeProgram = NodeProgram(statements)
             nodeProgram.setHeader(header)
             return nodeProgram
         
-    def findExpectedWord(self, word) -> str:
-                expectedWord = ""
-                maxSimilar = 0
-                for acc in help.ACCESS_MODIFIERS:
-                    sim = similar(str(word), str(acc))
-                    if sim > maxSimilar:
-                        expectedWord = acc
-                        maxSimilar = sim
-                for acc in help.KEY_WORDS:
-                    sim = similar(str(word), str(acc))
-                    if sim > maxSimilar:
-                        expectedWord = acc
-                        maxSimilar = sim
-                for acc in help.DATA_TYPES:
-                    sim = similar(str(word), str(acc))
-                    if sim > maxSimilar:
-                        expectedWord = acc
-                        maxSimilar = sim
-                return expectedWord
+    # Восстановление на уровне класса: пропускаем все до следующего метода
+    def skip_to_method(self, start):
+        while self.symbolTable.depth > 0:
+            self.symbolTable.pop()
+        if self.token is start and self.token.value != "EOF":
+            self.next_token()
+        while self.token.name not in help.ACCESS_MODIFIERS and self.token.value != "EOF":
+            self.next_token()
+
+    # Подсказка к неизвестному word: ближайшее по расстоянию правки видимое сейчас имя
+    # или, с keywords, ключевое слово; "" - ничего достаточно похожего нет
+    def findExpectedWord(self, word, keywords=True) -> str:
+        radius = max_distance(word)
+        found = self.symbolTable.suggest(word, radius)
+        if keywords:
+            found = sorted(found + KEYWORDS.search(word, radius))
+        return found[0][1] if found else ""
+
+
+class PanicMode(Exception):
+    # Бросается из Parser.error в режиме recover и ловится в ближайшей точке восстановления
+    pass
+
+
+class Diagnostic:
+    def __init__(self, message, line, pos):
+        self.message = message
+        self.line = line
+        self.pos = pos
+
+    def __repr__(self):
+        return f'Ошибка синтаксического анализа: {self.message}'
+
+
+class Diagnostics:
+    # Все ошибки одного разбора; сообщения строятся через SyntaxErrors и SemanticErrors
+    def __init__(self):
+        self.errors = []
+
+    def add(self, message, line, pos):
+        self.errors.append(Diagnostic(message, line, pos))
+
+    def __len__(self):
+        return len(self.errors)
+
+    def __iter__(self):
+        return iter(self.errors)
+
+    def __repr__(self):
+        return "\n".join(repr(e) for e in self.errors)
+
 
 class SemanticErrors:
     @staticmethod
@@ -1189,3 +1769,7 @@ class SyntaxErrors:
     @staticmethod
     def MissingDataType(line, pos):
         return f"Missing declaration data type in line {line} on position {pos}"
+
+    @staticmethod
+    def UnexpectedToken(text, line, pos):
+        return f"Unexpected token '{text}' in line {line} on position {pos}"
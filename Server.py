@@ -0,0 +1,219 @@
+import os
+import json
+import stat
+import time
+import socket
+import threading
+import socketserver
+import http.server
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Lexer_java import Lexer
+from Translator import TranslationError, translate_text
+
+
+def _translate_request(job):
+    text, engine, name = job
+    start = time.perf_counter()
+    try:
+        code, error = translate_text(text, engine, name), None
+    except TranslationError as e:
+        code, error = None, e.message
+    except Exception as e:
+        code, error = None, f"{e.__class__.__name__}: {e}"
+    return code, error, time.perf_counter() - start
+
+
+# Значение q-го процентиля (0..100) по отсортированному списку
+def percentile(values, q):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+class ServerStats:
+    # Сколько последних задержек хранится для процентилей
+    WINDOW = 10000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failed = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen=self.WINDOW)
+
+    def add(self, elapsed, ok):
+        with self.lock:
+            self.requests += 1
+            self.failed += not ok
+            self.latencies.append(elapsed)
+
+    def reject(self):
+        with self.lock:
+            self.rejected += 1
+
+    def as_dict(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            return {"requests": self.requests, "failed": self.failed, "rejected": self.rejected,
+                    "p50_ms": percentile(latencies, 50) * 1000, "p99_ms": percentile(latencies, 99) * 1000}
+
+
+"""
+Пул теплых процессов-исполнителей: в каждом один раз импортированы
+Lexer, Parser и CodeGenerator, и запрос стоит только самого перевода.
+Одновременно принимается не больше max_pending запросов (по умолчанию
+по два на процесс); сверх этого submit сразу возвращает None, и сервер
+отвечает 503 - клиент повторяет запрос позже, а очередь не растет.
+"""
+class TranslationPool:
+    def __init__(self, workers=None, engine=Lexer.CHAR_ENGINE, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.max_pending = max_pending or 2 * self.workers
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.executor = ProcessPoolExecutor(self.workers)
+        self.stats = ServerStats()
+
+    # Запускает все процессы заранее, чтобы первые запросы не ждали их старта
+    def warm_up(self):
+        jobs = [("public class A {\n}", self.engine, "<warm-up>")] * self.workers
+        list(self.executor.map(_translate_request, jobs))
+
+    # (текст на C# или None, ошибки или None, время перевода) или None, если пул занят
+    def submit(self, text, name="<request>"):
+        if not self.slots.acquire(blocking=False):
+            self.stats.reject()
+            return None
+        start = time.perf_counter()
+        try:
+            code, error, elapsed = self.executor.submit(_translate_request, (text, self.engine, name)).result()
+        finally:
+            self.slots.release()
+        self.stats.add(time.perf_counter() - start, error is None)
+        return code, error, elapsed
+
+    def close(self):
+        self.executor.shutdown()
+
+
+"""
+HTTP поверх TCP на localhost или Unix-сокета:
+    POST /translate   тело - исходник на Java (UTF-8), заголовок X-Source-Name -
+                      имя файла для сообщений; ответ - JSON {"code", "errors", "elapsed_ms"},
+                      200 при успешном переводе, 422 при ошибках разбора,
+                      503 с Retry-After, если пул занят
+    GET  /stats       JSON со счетчиками и задержками p50/p99 на сервере
+"""
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if self.path != "/translate":
+            return self._send(404, {"errors": f"Unknown path {self.path}"})
+        length = self.headers.get("Content-Length") or "0"
+        if not (length.isascii() and length.isdigit()):
+            # Где кончается тело, неизвестно - соединение дальше не читаем
+            self.close_connection = True
+            return self._send(400, {"errors": f"Invalid Content-Length: {length}"})
+        length = int(length)
+        try:
+            text = self.rfile.read(length).decode("utf-8")
+        except UnicodeDecodeError:
+            return self._send(400, {"errors": "Source is not valid UTF-8"})
+        result = self.server.pool.submit(text, self.headers.get("X-Source-Name", "<request>"))
+        if result is None:
+            return self._send(503, {"errors": "Server is busy"}, {"Retry-After": "1"})
+        code, error, elapsed = result
+        self._send(200 if error is None else 422, {"code": code, "errors": error, "elapsed_ms": elapsed * 1000})
+
+    def do_GET(self):
+        if self.path != "/stats":
+            return self._send(404, {"errors": f"Unknown path {self.path}"})
+        self._send(200, self.server.pool.stats.as_dict())
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    # У Unix-сокета адрес клиента - пустая строка
+    def address_string(self):
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _TCPHandler(_Handler):
+    # Заголовки и тело уходят отдельными записями - без этого Nagle и отложенный ACK дают +40 мс.
+    # Только для TCP: на Unix-сокете TCP_NODELAY не поддерживается
+    disable_nagle_algorithm = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+# Старый сокет от прошлого запуска удаляется, а любой другой файл по этому пути - нет
+def _remove_stale_socket(path):
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} already exists and is not a socket")
+    os.remove(path)
+
+
+"""
+Сервер перевода поверх TranslationPool: на Unix-сокете path или на
+127.0.0.1:port (port 0 - любой свободный, см. address). Каждое соединение
+обслуживает свой поток, сам перевод идет в процессах пула.
+"""
+class TranslationServer:
+    def __init__(self, pool, port=8765, path=None, verbose=False):
+        self.pool = pool
+        if path is not None:
+            _remove_stale_socket(path)
+            self.server = _UnixServer(path, _Handler)
+        else:
+            self.server = _TCPServer(("127.0.0.1", port), _TCPHandler)
+        self.server.pool = pool
+        self.server.verbose = verbose
+
+    @property
+    def address(self):
+        if self.server.address_family == socket.AF_UNIX:
+            return self.server.server_address
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    # Сервер в фоновом потоке - для встраивания и нагрузочного теста
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.server.address_family == socket.AF_UNIX:
+            try:
+                os.remove(self.server.server_address)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,140 @@
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+from Parser_java import Node
+from SymbolTable import SymbolTable
+
+
+"""
+Счетчики одного или нескольких переводов: время фаз (чтение, лексер,
+парсер, оптимизация, генерация), число токенов, узлов по классам, свернутых
+констант и удаленных инструкций, обращений к таблице символов, открытых областей видимости
+и наибольшая глубина вложенности.
+
+Сбор включается только передачей объекта TranslationStats в функции
+Translator (stats=...). Без него в код разбора ничего не подставляется:
+счетчики живут в обертке get_next_token и в CountingSymbolTable, которые
+ставятся на конкретный лексер и парсер. Со сбором сам замер добавляет
+к времени лексера около половины микросекунды на токен.
+"""
+class TranslationStats:
+    PHASES = ("read", "lex", "parse", "optimize", "codegen")
+
+    def __init__(self):
+        self.files = 0
+        self.times = dict.fromkeys(self.PHASES, 0.0)
+        self.tokens = 0
+        self.nodes = Counter()
+        self.folded = 0
+        self.eliminated = 0
+        self.lookups = 0
+        self.scopes = 0
+        self.max_depth = 0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] += time.perf_counter() - start
+
+    # Считает токены и время лексера; токены тянет парсер, поэтому это время вычитается из parse
+    def count_lexer(self, lexer):
+        get_next_token = lexer.get_next_token
+        times = self.times
+        clock = time.perf_counter
+
+        def counted():
+            start = clock()
+            try:
+                return get_next_token()
+            finally:
+                elapsed = clock() - start
+                times["lex"] += elapsed
+                times["parse"] -= elapsed
+                self.tokens += 1
+
+        lexer.get_next_token = counted
+        return lexer
+
+    def count_parser(self, parser):
+        parser.symbolTable = CountingSymbolTable(self)
+        return parser
+
+    def count_tree(self, tree):
+        stack = [tree]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Node):
+                self.nodes[type(item).__name__] += 1
+                stack.extend(value for _, value in item.items())
+            elif isinstance(item, list):
+                stack.extend(item)
+
+    # Сложение счетчиков - например, собранных по файлам в разных процессах
+    def merge(self, other):
+        self.files += other.files
+        for name in self.PHASES:
+            self.times[name] += other.times[name]
+        self.tokens += other.tokens
+        self.nodes.update(other.nodes)
+        self.folded += other.folded
+        self.eliminated += other.eliminated
+        self.lookups += other.lookups
+        self.scopes += other.scopes
+        self.max_depth = max(self.max_depth, other.max_depth)
+        return self
+
+    def as_dict(self):
+        return {
+            "files": self.files,
+            "time_ms": {name: self.times[name] * 1000 for name in self.PHASES},
+            "tokens": self.tokens,
+            "nodes": dict(self.nodes.most_common()),
+            "folded_constants": self.folded,
+            "eliminated_statements": self.eliminated,
+            "symbol_lookups": self.lookups,
+            "scopes_pushed": self.scopes,
+            "max_scope_depth": self.max_depth,
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
+
+    def __repr__(self):
+        total = sum(self.times.values())
+        phases = ", ".join(f"{name} {self.times[name] * 1000:.1f} ms" for name in self.PHASES)
+        nodes = ", ".join(f"{name} {count}" for name, count in self.nodes.most_common())
+        return f"files: {self.files}\n" \
+               f"time: {phases}, total {total * 1000:.1f} ms\n" \
+               f"tokens: {self.tokens}\n" \
+               f"nodes: {sum(self.nodes.values())} ({nodes})\n" \
+               f"folded constants: {self.folded}, eliminated statements: {self.eliminated}\n" \
+               f"symbol table: {self.lookups} lookups, {self.scopes} scopes pushed, max depth {self.max_depth}"
+
+
+# Фаза с замером времени, если stats задан, иначе пустой контекст
+def timer(stats, name):
+    return nullcontext() if stats is None else stats.phase(name)
+
+
+class CountingSymbolTable(SymbolTable):
+    def __init__(self, stats):
+        super().__init__()
+        self.stats = stats
+
+    def push(self):
+        super().push()
+        self.stats.scopes += 1
+        self.stats.max_depth = max(self.stats.max_depth, self.depth)
+
+    def lookup(self, _id):
+        self.stats.lookups += 1
+        return super().lookup(_id)
+
+    def isExist(self, _id) -> bool:
+        self.stats.lookups += 1
+        return super().isExist(_id)
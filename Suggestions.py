@@ -0,0 +1,102 @@
+# Больше двух правок подсказка уже скорее сбивает с толку
+MAX_DISTANCE = 2
+
+
+# Расстояние Левенштейна: число вставок, удалений и замен символов.
+# С limit счет бросается, как только расстояние наверняка больше него, - тогда limit + 1
+def edit_distance(a, b, limit=None) -> int:
+    # Общие начало и конец на расстояние не влияют, а у опечатки это почти все слово
+    n = min(len(a), len(b))
+    start = 0
+    while start < n and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < n - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    if not b:
+        return len(a)
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            cur = row[j]
+            # При совпадении символов диагональ никогда не хуже соседей
+            row[j] = prev if ca == cb else min(prev, cur, row[j - 1]) + 1
+            prev = cur
+        if limit is not None and min(row) > limit:
+            return limit + 1
+    return row[-1] if limit is None else min(row[-1], limit + 1)
+
+
+# Сколько правок допускается в подсказке для слова такой длины: у однобуквенного ни одной
+def max_distance(word) -> int:
+    return min(MAX_DISTANCE, (len(word) + 1) // 3)
+
+
+# Само слово и все строки, получаемые из него удалением не больше depth символов
+def _deletes(word, depth) -> set:
+    result = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+"""
+Индекс слов для подсказок "did you mean" по симметричным удалениям: если
+между двумя словами не больше r правок, то удалением не больше r символов
+из каждого получается общая строка. Каждое слово заранее раскладывается
+на свои удаления (до MAX_DISTANCE), и поиск - это несколько десятков
+обращений к словарю по удалениям запроса и проверка расстояния только
+у найденных кандидатов, сколько бы слов ни было в индексе и как бы они
+ни были похожи друг на друга (value1, value2, ...).
+add только запоминает слово - разложено оно будет при следующем поиске,
+так что пополнение на каждом объявлении стоит одного append. Ленивое
+разложение не защищено от потоков: общий для всех парсеров индекс надо
+разложить сразу (expand), тогда search его только читает.
+"""
+class SuggestionIndex:
+    def __init__(self, words=()):
+        # Удаление -> слова, из которых оно получается
+        self.index = {}
+        self.words = set()
+        self.pending = []
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if word not in self.words:
+            self.words.add(word)
+            self.pending.append(word)
+
+    # Раскладывает добавленные слова по удалениям
+    def expand(self):
+        for pending in self.pending:
+            for key in _deletes(pending, MAX_DISTANCE):
+                self.index.setdefault(key, []).append(pending)
+        self.pending.clear()
+        return self
+
+    def __len__(self):
+        return len(self.words)
+
+    # Пары (расстояние, слово) не дальше radius (не больше MAX_DISTANCE) от word, ближайшие первыми
+    def search(self, word, radius) -> list:
+        if self.pending:
+            self.expand()
+        candidates = set()
+        for key in _deletes(word, radius):
+            candidates.update(self.index.get(key, ()))
+        found = []
+        for candidate in candidates:
+            d = edit_distance(word, candidate, radius)
+            if d <= radius:
+                found.append((d, candidate))
+        found.sort()
+        return found
@@ -1,10 +1,64 @@
+from Suggestions import SuggestionIndex
+
+
+class Symbol:
+    VARIABLE, PARAMETER, METHOD = "variable", "parameter", "method"
+
+    def __init__(self, name, _type, kind=VARIABLE, depth=0):
+        self.name = name
+        self.type = _type
+        self.kind = kind
+        # Глубина области видимости, в которой объявлен символ
+        self.depth = depth
+
+    def __repr__(self):
+        return f"{self.kind} {self.type} {self.name}"
+
+
 class SymbolTable:
-    # В таблице символов хранятся пары: id и type
+    # Для каждого id хранится стек его объявлений (последнее - самое внутреннее),
+    # а для каждой области видимости - список объявленных в ней id.
+    # Поиск - одно обращение к словарю, выход из области снимает ровно ее объявления.
     def __init__(self):
         self.table = dict()
+        self.scopes = [[]]
+        # Все когда-либо объявленные имена - для подсказок к неизвестным идентификаторам
+        self.names = SuggestionIndex()
+
+    @property
+    def depth(self) -> int:
+        return len(self.scopes) - 1
+
+    def push(self):
+        self.scopes.append([])
+
+    def pop(self):
+        for _id in self.scopes.pop():
+            stack = self.table[_id]
+            stack.pop()
+            if not stack:
+                del self.table[_id]
+
+    def declare(self, _id, _type, kind=Symbol.VARIABLE) -> Symbol:
+        stack = self.table.get(_id)
+        # Повторное объявление в той же области только уточняет запись
+        if stack and stack[-1].depth == self.depth:
+            stack[-1].type = _type
+            stack[-1].kind = kind
+            return stack[-1]
+        symbol = Symbol(_id, _type, kind, self.depth)
+        self.table.setdefault(_id, []).append(symbol)
+        self.scopes[-1].append(_id)
+        self.names.add(_id)
+        return symbol
+
+    def lookup(self, _id):
+        stack = self.table.get(_id)
+        return stack[-1] if stack else None
 
     def isExist(self, _id) -> bool:
-        if _id in self.table.keys():
-            return True
-        else:
-            return False
+        return _id in self.table
+
+    # Пары (расстояние, имя) видимых сейчас имен не дальше radius правок от word, ближайшие первыми
+    def suggest(self, word, radius) -> list:
+        return [(d, name) for d, name in self.names.search(word, radius) if name in self.table]
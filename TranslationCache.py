@@ -0,0 +1,176 @@
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import importlib
+
+
+# Исходники, от которых зависит результат перевода: их изменение сбрасывает весь кэш.
+# Модули берутся по имени при первом подсчете - Translator сам импортирует этот модуль
+_TRANSLATOR_MODULES = ("Lexer_java", "Parser_java", "SymbolTable", "Suggestions", "Optimizer", "CodeGenerator",
+                       "AstSerializer", "Translator")
+_version = None
+
+
+def translator_version() -> str:
+    global _version
+    if _version is None:
+        h = hashlib.sha256()
+        for name in _TRANSLATOR_MODULES:
+            with open(importlib.import_module(name).__file__, "rb") as f:
+                h.update(f.read())
+        _version = h.hexdigest()[:16]
+    return _version
+
+
+class CacheStats:
+    def __init__(self, hits=0, misses=0, evicted=0):
+        self.hits = hits
+        self.misses = misses
+        self.evicted = evicted
+
+    def __repr__(self):
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0.0
+        return f"cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit), {self.evicted} evicted"
+
+
+"""
+Кэш перевода на диске с адресацией по содержимому. Ключ - sha256 от версии
+транслятора, движка лексера (от него зависят позиции в сообщениях об ошибках)
+и байтов исходного файла, значение - готовый текст на C# (.cs)
+или текст ошибок разбора (.err). Записи лежат в root/<2 символа ключа>/.
+
+Запись идет во временный файл в том же каталоге с последующим os.replace,
+поэтому параллельные процессы никогда не видят недописанную запись, а при
+гонке двух писателей остается одна из двух одинаковых записей. Попадание
+обновляет mtime записи; evict удаляет самые давно использованные записи,
+пока общий размер не станет не больше max_size байт.
+"""
+class TranslationCache:
+    CODE, ERROR = ".cs", ".err"
+    # Временные файлы брошенных писателей старше этого возраста удаляет evict
+    STALE_TEMP = 3600
+
+    def __init__(self, root, max_size=512 * 2 ** 20):
+        self.root = root
+        self.max_size = max_size
+        self.stats = CacheStats()
+
+    def key(self, source, engine) -> str:
+        h = hashlib.sha256(translator_version().encode())
+        h.update(engine.encode() + b"\0")
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _path(self, key, kind):
+        return os.path.join(self.root, key[:2], key + kind)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            # Запись успели вытеснить
+            return False
+
+    """
+    Перевод из кэша: копирует C# в target и возвращает None, для
+    закэшированной ошибки возвращает ее текст. При промахе - KeyError.
+    """
+    def restore(self, key, target):
+        path = self._path(key, self.CODE)
+        if self._touch(path):
+            try:
+                os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+                shutil.copyfile(path, target)
+                self.stats.hits += 1
+                return None
+            except FileNotFoundError:
+                pass
+        path = self._path(key, self.ERROR)
+        if self._touch(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    message = f.read()
+                self.stats.hits += 1
+                return message
+            except FileNotFoundError:
+                pass
+        self.stats.misses += 1
+        raise KeyError(key)
+
+    def _store(self, key, kind, write):
+        directory = os.path.join(self.root, key[:2])
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, self._path(key, kind))
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    # Запоминает готовый файл C#
+    def store_code(self, key, target):
+        with open(target, "rb") as src:
+            self._store(key, self.CODE, lambda f: shutil.copyfileobj(src, f))
+
+    # Запоминает ошибки разбора - они тоже зависят только от текста файла
+    def store_error(self, key, message):
+        self._store(key, self.ERROR, lambda f: f.write(message.encode("utf-8")))
+
+    def entries(self):
+        res = []
+        if not os.path.isdir(self.root):
+            return res
+        now = time.time()
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.startswith(".tmp-"):
+                    if now - st.st_mtime > self.STALE_TEMP:
+                        self._remove(entry.path)
+                    continue
+                res.append((st.st_mtime, st.st_size, entry.path))
+        return res
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    # Вытеснение давно не использованных записей; возвращает число удаленных
+    def evict(self) -> int:
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            if self._remove(path):
+                evicted += 1
+            total -= size
+        self.stats.evicted += evicted
+        return evicted
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,285 @@
+import io
+import os
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from Lexer_java import Lexer, TokenBuffer
+from Parser_java import Parser, node_filter
+from CodeGenerator import CodeGenerator
+import AstSerializer
+from TranslationCache import CacheStats
+from Stats import TranslationStats, timer
+from Optimizer import fold_constants, eliminate_dead_code
+
+
+class TranslationError(Exception):
+    def __init__(self, source, message):
+        self.source = source
+        self.message = message
+
+    def __str__(self):
+        return f"{self.source}: {self.message}"
+
+
+# Лексер для указанного движка; TokenBuffer.ENGINE - столбцовый буфер токенов всего файла.
+# С stats (TranslationStats) замеряются чтение и лексический анализ.
+def make_lexer(source, engine=Lexer.CHAR_ENGINE, stats=None):
+    with timer(stats, "read"):
+        lexer = Lexer(source, Lexer.REGEX_ENGINE if engine == TokenBuffer.ENGINE else engine)
+    if engine == TokenBuffer.ENGINE:
+        with timer(stats, "lex"):
+            lexer = TokenBuffer(lexer)
+    if stats is not None:
+        stats.count_lexer(lexer)
+    return lexer
+
+
+"""
+Функция parse прогоняет один файл через Lexer и Parser.parse().
+Парсер работает в режиме recover, поэтому TranslationError содержит
+сразу все найденные в файле ошибки. Глобальное состояние не меняется,
+так что parse и translate можно звать из нескольких потоков.
+Файл .jast (AstSerializer) не разбирается заново, а загружается готовым деревом.
+С stats (TranslationStats) в него добавляются время фаз и счетчики разбора.
+"""
+def parse(source, engine=Lexer.CHAR_ENGINE, stats=None):
+    if source.endswith(AstSerializer.SUFFIX):
+        try:
+            with timer(stats, "read"):
+                program = AstSerializer.load(source)
+        except AstSerializer.AstFormatError as e:
+            raise TranslationError(source, str(e))
+        if stats is not None:
+            stats.files += 1
+            stats.count_tree(program)
+        return program
+    return parse_lexer(make_lexer(source, engine, stats), source, stats)
+
+
+# Разбор текста программы, а не файла; name - имя для сообщений об ошибках
+def parse_text(text, engine=Lexer.CHAR_ENGINE, name="<text>", stats=None):
+    return parse_lexer(make_lexer(io.StringIO(text), engine, stats), name, stats)
+
+
+# Разбор уже созданного лексера со сверткой констант и удалением мертвого кода; source - имя файла для сообщений об ошибках
+def parse_lexer(lexer, source, stats=None):
+    parser = Parser(lexer, recover=True)
+    if stats is not None:
+        stats.files += 1
+        stats.count_parser(parser)
+    try:
+        with timer(stats, "parse"):
+            program = parser.parse()
+    except Exception:
+        # Разбор после ошибок может споткнуться о недостроенное дерево - тогда важнее сами ошибки
+        if parser.diagnostics:
+            raise TranslationError(source, str(parser.diagnostics))
+        raise
+    if parser.diagnostics:
+        raise TranslationError(source, str(parser.diagnostics))
+    with timer(stats, "optimize"):
+        folded = fold_constants(program)
+        eliminated = eliminate_dead_code(program)
+    if stats is not None:
+        stats.folded += folded
+        stats.eliminated += eliminated
+        stats.count_tree(program)
+    return program
+
+
+def generate(program, stats=None) -> str:
+    with timer(stats, "codegen"):
+        return str(CodeGenerator(program))
+
+
+# Текст на C# для одного файла
+def translate(source, engine=Lexer.CHAR_ENGINE, stats=None) -> str:
+    return generate(parse(source, engine, stats), stats)
+
+
+# Текст на C# для текста программы
+def translate_text(text, engine=Lexer.CHAR_ENGINE, name="<text>", stats=None) -> str:
+    return generate(parse_text(text, engine, name, stats), stats)
+
+
+# Параметры печати дерева разбора: глубина и имя узла для node_filter (None - без ограничений)
+class TreeOptions:
+    def __init__(self, depth=None, select=None):
+        self.depth = depth
+        self.select = select
+
+    def dump(self, program, out):
+        select = node_filter(self.select) if self.select is not None else None
+        program.dump(out, self.depth, select)
+
+
+def tree_path(target):
+    return os.path.splitext(target)[0] + ".tree"
+
+
+def ast_path(target):
+    return os.path.splitext(target)[0] + AstSerializer.SUFFIX
+
+
+"""
+Перевод одного файла с записью результата прямо в target, без промежуточной строки.
+Если задан tree (TreeOptions), дерево разбора пишется рядом в tree_path(target),
+с save_ast - само дерево в двоичном виде в ast_path(target) для повторной генерации.
+"""
+def translate_file(source, target, engine=Lexer.CHAR_ENGINE, tree=None, save_ast=False, stats=None) -> str:
+    program = parse(source, engine, stats)
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    with timer(stats, "codegen"):
+        CodeGenerator(program).save(target)
+    if tree is not None:
+        with open(tree_path(target), "w") as f:
+            tree.dump(program, f)
+    if save_ast:
+        AstSerializer.save(program, ast_path(target))
+    return target
+
+
+"""
+Собирает список файлов для пакетной обработки. Каждый элемент inputs -
+это либо каталог (обходится рекурсивно по маске pattern), либо glob,
+либо путь к файлу. Возвращает пары (путь к файлу, корень для зеркалирования).
+"""
+def collect_sources(inputs, pattern="*.java"):
+    sources = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for path in sorted(glob.glob(os.path.join(item, "**", pattern), recursive=True)):
+                sources.append((path, item))
+        else:
+            root = _glob_root(item)
+            for path in sorted(glob.glob(item, recursive=True)) or [item]:
+                sources.append((path, root))
+    return sources
+
+
+# Часть шаблона до первого элемента с * ? [ - от нее строится зеркальное дерево
+def _glob_root(item):
+    parts = []
+    for part in os.path.dirname(item).split(os.sep):
+        if any(c in part for c in "*?["):
+            break
+        parts.append(part)
+    return os.sep.join(parts)
+
+
+def target_path(source, root, output_dir):
+    rel = os.path.relpath(source, root or ".")
+    return os.path.join(output_dir, os.path.splitext(rel)[0] + ".cs")
+
+
+"""
+Задание пакетного перевода для процесса-исполнителя. С кэшем (TranslationCache)
+неизмененный файл стоит одного хэша и копирования готового .cs; дерево (.tree)
+и .jast из кэша не восстановить, поэтому с ними файл всегда разбирается.
+Возвращает (source, target, ошибка или None, время, попадание в кэш или None,
+TranslationStats файла или None).
+"""
+def _translate_job(job):
+    source, target, engine, tree, save_ast, cache, with_stats = job
+    start = time.perf_counter()
+    key = None
+    stats = TranslationStats() if with_stats else None
+    try:
+        if cache is not None:
+            key = cache.key(source, engine)
+            if tree is None and not save_ast:
+                try:
+                    error = cache.restore(key, target)
+                    return source, target, error, time.perf_counter() - start, True, stats
+                except KeyError:
+                    pass
+        translate_file(source, target, engine, tree, save_ast, stats)
+        if key is not None:
+            cache.store_code(key, target)
+        error = None
+    except TranslationError as e:
+        if key is not None:
+            cache.store_error(key, e.message)
+        error = e.message
+    except Exception as e:
+        error = f"{e.__class__.__name__}: {e}"
+    return source, target, error, time.perf_counter() - start, False if key else None, stats
+
+
+class BatchResult:
+    def __init__(self, results, elapsed, cache=None, stats=None):
+        self.results = results
+        self.elapsed = elapsed
+        # CacheStats этого запуска, если кэш был включен
+        self.cache = cache
+        # TranslationStats, сложенные по всем файлам, если их собирали
+        self.stats = stats
+
+    @property
+    def failed(self):
+        return [r for r in self.results if r[2] is not None]
+
+    @property
+    def files_per_second(self):
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return f"{len(self.results)} files, {len(self.failed)} failed, " \
+               f"{self.elapsed:.2f} s, {self.files_per_second:.1f} files/s"
+
+
+"""
+Пакетный перевод дерева исходников. Файлы раздаются по процессам
+ProcessPoolExecutor (по умолчанию по числу ядер), результат каждого
+файла пишется в output_dir с сохранением структуры каталогов.
+report вызывается для каждого файла по мере готовности.
+Дерево разбора печатается только при заданном tree (TreeOptions).
+С cache (TranslationCache) неизмененные файлы берутся из кэша, после
+запуска кэш ужимается до своего предельного размера.
+В stats (TranslationStats) складываются счетчики, собранные по каждому файлу.
+"""
+def translate_tree(inputs, output_dir, pattern="*.java", workers=None, report=None,
+                   engine=Lexer.CHAR_ENGINE, tree=None, save_ast=False, cache=None, stats=None) -> BatchResult:
+    jobs = [(source, target_path(source, root, output_dir), engine, tree, save_ast, cache, stats is not None)
+            for source, root in collect_sources(inputs, pattern)]
+    results = []
+    cache_stats = CacheStats() if cache is not None else None
+    start = time.perf_counter()
+    if jobs:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for *result, cached, job_stats in pool.map(_translate_job, jobs, chunksize=chunksize):
+                results.append(tuple(result))
+                if job_stats is not None:
+                    stats.merge(job_stats)
+                if cached is not None:
+                    if cached:
+                        cache_stats.hits += 1
+                    else:
+                        cache_stats.misses += 1
+                if report is not None:
+                    report(*result)
+    if cache is not None:
+        cache_stats.evicted = cache.evict()
+    return BatchResult(results, time.perf_counter() - start, cache_stats, stats)
+
+
+def _translate_text(job):
+    source, engine = job
+    try:
+        return source, translate(source, engine), None
+    except TranslationError as e:
+        return source, None, e.message
+    except Exception as e:
+        return source, None, f"{e.__class__.__name__}: {e}"
+
+
+"""
+Перевод нескольких файлов в пуле потоков внутри одного процесса - для
+долгоживущих сервисов, которые не могут запускать процесс на каждый запрос.
+Возвращает список (путь, текст на C# или None, ошибка или None) в порядке paths.
+"""
+def translate_many(paths, max_workers=None, engine=Lexer.CHAR_ENGINE) -> list:
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_translate_text, [(path, engine) for path in paths]))
@@ -0,0 +1,240 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from fnmatch import fnmatch
+
+import AstSerializer
+from Lexer_java import Lexer
+from Incremental import IncrementalTranslator
+from Translator import (TranslationError, collect_sources, target_path, translate_file, tree_path, ast_path,
+                        _glob_root)
+
+
+# Константы inotify из <sys/inotify.h>
+IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x8, 0x40, 0x80, 0x100, 0x200
+IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x4000, 0x8000, 0x40000000
+IN_CLOEXEC = 0o2000000
+
+
+"""
+Слежение за каталогами через inotify (Linux), без сторонних библиотек.
+Новые подкаталоги ставятся на слежение по мере появления. wait блокируется
+до первого события и возвращает множество измененных путей, для которых
+match истинно, или None, если очередь ядра переполнилась и события потеряны.
+"""
+class InotifyWatcher:
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+    # Редактор сохраняет файл несколькими событиями подряд - ждем, пока они кончатся
+    DEBOUNCE = 0.02
+
+    def __init__(self, roots, match):
+        self.match = match
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        for root in roots:
+            self._add_tree(root)
+
+    def _add_tree(self, root):
+        found = set()
+        for directory, _, names in os.walk(root):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                code = ctypes.get_errno()
+                # Кончился лимит слежений - дальше работать нельзя, пусть вызывающий перейдет на опрос
+                if code == errno.ENOSPC:
+                    raise OSError(code, "inotify watch limit reached")
+                continue
+            self.dirs[wd] = directory
+            # Файлы, появившиеся до постановки каталога на слежение
+            found.update(p for p in (os.path.join(directory, n) for n in names) if self.match(p))
+        return found
+
+    def wait(self):
+        changed = set()
+        overflow = False
+        timeout = None
+        while True:
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if not ready:
+                return None if overflow else changed
+            data = os.read(self.fd, 1 << 16)
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, length = self.EVENT.unpack_from(data, pos)
+                name = os.fsdecode(data[pos + self.EVENT.size:pos + self.EVENT.size + length].rstrip(b"\0"))
+                pos += self.EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                elif wd in self.dirs:
+                    path = os.path.join(self.dirs[wd], name)
+                    if mask & IN_ISDIR:
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            changed.update(self._add_tree(path))
+                    elif self.match(path):
+                        changed.add(path)
+            timeout = self.DEBOUNCE
+
+    def close(self):
+        os.close(self.fd)
+
+
+"""
+Запасной вариант без inotify: раз в interval секунд сравнивает mtime и
+размер подходящих файлов с прошлым обходом.
+"""
+class PollingWatcher:
+    def __init__(self, roots, match, interval=0.5):
+        self.roots = roots
+        self.match = match
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        files = {}
+        for root in self.roots:
+            for directory, _, names in os.walk(root):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    if not self.match(path):
+                        continue
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files[path] = (st.st_mtime_ns, st.st_size)
+        return files
+
+    def wait(self):
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._scan()
+            changed = {p for p in snapshot.keys() | self.snapshot.keys() if snapshot.get(p) != self.snapshot.get(p)}
+            self.snapshot = snapshot
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(roots, match, poll=False):
+    if not poll:
+        try:
+            return InotifyWatcher(roots, match)
+        except (OSError, AttributeError):
+            # Не Linux (в libc нет inotify_init1) или исчерпаны лимиты inotify
+            pass
+    return PollingWatcher(roots, match)
+
+
+"""
+Режим --watch: файлы из inputs (как в translate_tree) переводятся один раз,
+после чего при каждом сохранении заново переводится только сохраненный файл.
+Для каждого файла в памяти остаются IncrementalTranslator с методами его
+последней версии и последний текст на C#, поэтому правка одного метода
+стоит разбора этого метода, а .cs перезаписывается, только если изменился.
+report вызывается как в translate_tree: (source, target, ошибка или None, время).
+"""
+class TreeWatcher:
+    def __init__(self, inputs, output_dir, pattern="*.java", report=None,
+                 engine=Lexer.CHAR_ENGINE, tree=None, save_ast=False):
+        self.inputs = inputs
+        self.output_dir = output_dir
+        self.pattern = pattern
+        self.report = report
+        self.engine = engine
+        self.tree = tree
+        self.save_ast = save_ast
+        # Маски имен файлов: каталоги обходятся по pattern, у glob и файлов - своя последняя часть
+        self.names = [pattern if os.path.isdir(item) else os.path.basename(item) for item in inputs]
+        self.roots = sorted({item if os.path.isdir(item) else _glob_root(item) or "." for item in inputs})
+        self.translators = {}
+        self.outputs = {}
+        self.sources = {}
+        self.refresh()
+
+    def match(self, path):
+        name = os.path.basename(path)
+        return any(fnmatch(name, n) for n in self.names)
+
+    # Заново собирает список файлов - при появлении новых файлов с подходящим именем
+    def refresh(self):
+        self.sources = {os.path.normpath(source): (source, root)
+                        for source, root in collect_sources(self.inputs, self.pattern)}
+
+    def translate(self, path):
+        key = os.path.normpath(path)
+        if key not in self.sources:
+            self.refresh()
+            if key not in self.sources:
+                return None
+        source, root = self.sources[key]
+        target = target_path(source, root, self.output_dir)
+        start = time.perf_counter()
+        try:
+            if source.endswith(AstSerializer.SUFFIX):
+                # Готовое дерево не разбирается, и хранить для него нечего
+                translate_file(source, target, self.engine, self.tree, self.save_ast)
+            else:
+                self._translate(key, source, target)
+            error = None
+        except FileNotFoundError:
+            # Файл удален или переименован - забываем его состояние
+            self.translators.pop(key, None)
+            self.outputs.pop(key, None)
+            self.sources.pop(key, None)
+            return None
+        except TranslationError as e:
+            error = e.message
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+        result = (source, target, error, time.perf_counter() - start)
+        if self.report is not None:
+            self.report(*result)
+        return result
+
+    def _translate(self, key, source, target):
+        translator = self.translators.get(key)
+        if translator is None:
+            translator = self.translators[key] = IncrementalTranslator(self.engine)
+        code = translator.translate_file(source)
+        if self.outputs.get(key) != code or not os.path.exists(target):
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            with open(target, "w") as f:
+                f.write(code)
+            self.outputs[key] = code
+        if self.tree is not None:
+            with open(tree_path(target), "w") as f:
+                self.tree.dump(translator.program, f)
+        if self.save_ast:
+            AstSerializer.save(translator.program, ast_path(target))
+
+    def translate_all(self):
+        return [result for result in map(self.translate, list(self.sources)) if result is not None]
+
+    # Перевод всех файлов и дальше - по событиям watcher, пока не прервут
+    def run(self, watcher=None):
+        watcher = watcher or make_watcher(self.roots, self.match)
+        try:
+            self.translate_all()
+            while True:
+                changed = watcher.wait()
+                if changed is None:
+                    # События потеряны - перепроверяем все файлы, неизмененные методы возьмутся из памяти
+                    self.refresh()
+                    changed = set(self.sources)
+                for path in sorted(changed):
+                    self.translate(path)
+        finally:
+            watcher.close()
+
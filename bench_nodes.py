@@ -0,0 +1,81 @@
+import gc
+import os
+import sys
+import time
+import resource
+import tempfile
+import tracemalloc
+
+from Lexer_java import Lexer
+from Parser_java import Parser, Node
+
+
+"""
+Память, которую занимает дерево разбора: генерируется синтетическая программа
+из N повторов набора инструкций, дерево держится в памяти, печатаются число
+узлов, байт на узел (по tracemalloc, вместе со строками полей) и пиковый RSS.
+    python bench_nodes.py 5000
+"""
+BODY = """x = (1 + y) * (y - 2) / y + -(y * 3) + x;
+if (x < y && y > 1) {
+y = x + 1 - (y * x);
+}
+else {
+y = 2;
+}
+while (x > 1) {
+x = x - 1;
+}
+System.out.println(x + y * (x - y));
+"""
+
+
+def synthetic(path, repeat):
+    with open(path, "w") as f:
+        f.write("public class A {\npublic static void main(int x) {\nint y = 3;\n")
+        for _ in range(repeat):
+            f.write(BODY)
+        f.write("}\n}\n")
+
+
+def count_nodes(tree):
+    count = 0
+    stack = [tree]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Node):
+            count += 1
+            stack.extend(value for _, value in item.items())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return count
+
+
+def main(repeat):
+    fd, path = tempfile.mkstemp(suffix=".java")
+    os.close(fd)
+    try:
+        synthetic(path, repeat)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        parser = Parser(Lexer(path, Lexer.REGEX_ENGINE))
+        tree = parser.parse()
+        elapsed = time.perf_counter() - start
+        del parser
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+    finally:
+        os.remove(path)
+    nodes = count_nodes(tree)
+    # ru_maxrss в Linux - в килобайтах
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{nodes} nodes, {size / 2 ** 20:.1f} MiB, {size / nodes:.1f} bytes/node")
+    print(f"parse: {elapsed:.3f} s, peak RSS: {peak:.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,176 @@
+import gc
+import os
+import sys
+import math
+import time
+import argparse
+import tempfile
+
+from Lexer_java import Lexer
+from Parser_java import Parser
+from CodeGenerator import CodeGenerator
+from bench_nodes import count_nodes
+
+
+"""
+Масштабирование лексера, парсера и генератора на синтетических программах.
+Каждое измерение (число методов, инструкций, длина выражения, глубина
+вложенности) растет, остальные остаются маленькими; для каждого размера
+печатаются токены/с Lexer.get_next_token, узлы/с Parser.parse и байты/с
+CodeGenerator, а также показатель роста k: время ~ размер^k между соседними
+размерами и по всему ряду (k fit). k заметно больше 1 - признак
+сверхлинейного поведения; размер считается в токенах.
+    python bench_scaling.py                     # все измерения
+    python bench_scaling.py expression -s 8     # одно измерение, 8 удвоений
+"""
+# {0} - номер инструкции: переменная цикла for остается объявленной до конца метода
+STATEMENTS = [
+    "for (int i{0} = 0; i{0} < 10; i{0}++) {{\nx = x + i{0} * 2;\n}}\n",
+    "while (x > 1) {{\nx = x - 1;\n}}\n",
+    "if (x < y && y > 1) {{\ny = x + 1 - (y * x);\n}}\nelse {{\ny = 2;\n}}\n",
+    "switch (x) {{\ncase 1:\nx = 0;\nbreak;\ncase 2:\nbreak;\ndefault:\nx = 4;\nbreak;\n}}\n",
+    "System.out.println(x + y * (x - y));\n",
+]
+
+
+def method(name, body):
+    return f"public static void {name}(int x) {{\nint y = 3;\n{body}}}\n"
+
+
+def program(methods):
+    return "public class Bench {\n" + "".join(methods) + "}\n"
+
+
+def statements(n):
+    return "".join(STATEMENTS[i % len(STATEMENTS)].format(i) for i in range(n))
+
+
+def gen_methods(n):
+    return program(method(f"m{i}", statements(len(STATEMENTS))) for i in range(n))
+
+
+def gen_statements(n):
+    return program([method("main", statements(n))])
+
+
+def gen_expression(n):
+    ops = ["+", "-", "*", "+"]
+    expr = "x" + "".join(f" {ops[i % len(ops)]} (y + {i})" for i in range(n))
+    return program([method("main", f"x = {expr};\n")])
+
+
+def gen_nesting(n):
+    body = "".join(("if (x > 1) {\n" if i % 2 else "while (x < 100) {\n") for i in range(n))
+    return program([method("main", body + "x = x + 1;\n" + "}\n" * n)])
+
+
+DIMENSIONS = {
+    "methods": (gen_methods, 16),
+    "statements": (gen_statements, 64),
+    "expression": (gen_expression, 64),
+    "nesting": (gen_nesting, 8),
+}
+
+
+# Лучшее время из повторов, пока на них не уйдет min_time - иначе малые размеры тонут в шуме
+def timed(fn, min_time=0.2):
+    best = math.inf
+    total = 0.0
+    while total < min_time:
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+    return result, best
+
+
+def lex(path):
+    lexer = Lexer(path, Lexer.REGEX_ENGINE)
+    count = 0
+    while lexer.get_next_token().value != "EOF":
+        count += 1
+    return count
+
+
+def parse(path):
+    parser = Parser(Lexer(path, Lexer.REGEX_ENGINE), recover=True)
+    tree = parser.parse()
+    if parser.diagnostics:
+        raise ValueError(f"Synthetic program does not parse: {parser.diagnostics}")
+    return tree
+
+
+# Одно измерение: (токены, время лексера, узлы, время парсера, байты, время генератора)
+def measure(path):
+    gc.collect()
+    tokens, lex_time = timed(lambda: lex(path))
+    tree, parse_time = timed(lambda: parse(path))
+    code, gen_time = timed(lambda: str(CodeGenerator(tree)))
+    return tokens, lex_time, count_nodes(tree), parse_time, len(code.encode()), gen_time
+
+
+def exponent(size, prev_size, elapsed, prev_elapsed):
+    if prev_size is None or size == prev_size or min(elapsed, prev_elapsed) <= 0:
+        return ""
+    return f"{math.log(elapsed / prev_elapsed) / math.log(size / prev_size):5.2f}"
+
+
+# Наклон прямой по методу наименьших квадратов в осях log(размер), log(время)
+def fit(sizes, times):
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(t) for t in times]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    dx = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / dx if dx else 0.0
+
+
+def sweep(name, steps, path):
+    gen, start = DIMENSIONS[name]
+    print(f"\n{name}")
+    print(f"{'size':>8} {'tokens':>9} {'tok/s':>10} {'k':>5} {'nodes':>9} {'nodes/s':>10} {'k':>5} "
+          f"{'bytes':>10} {'bytes/s':>11} {'k':>5}")
+    prev = None
+    rows = []
+    for step in range(steps):
+        size = start << step
+        with open(path, "w") as f:
+            f.write(gen(size))
+        try:
+            tokens, lex_time, nodes, parse_time, size_bytes, gen_time = measure(path)
+        except RecursionError:
+            print(f"{size:>8} RecursionError")
+            break
+        p = prev or (None,) * 6
+        print(f"{size:>8} {tokens:>9} {tokens / lex_time:>10.0f} {exponent(tokens, p[0], lex_time, p[1]):>5} "
+              f"{nodes:>9} {nodes / parse_time:>10.0f} {exponent(tokens, p[0], parse_time, p[3]):>5} "
+              f"{size_bytes:>10} {size_bytes / gen_time:>11.0f} {exponent(tokens, p[0], gen_time, p[5]):>5}")
+        prev = (tokens, lex_time, nodes, parse_time, size_bytes, gen_time)
+        rows.append(prev)
+    if len(rows) > 1:
+        sizes = [row[0] for row in rows]
+        print(f"{'k fit':>8} {'':>9} {'':>10} {fit(sizes, [row[1] for row in rows]):5.2f} "
+              f"{'':>9} {'':>10} {fit(sizes, [row[3] for row in rows]):5.2f} "
+              f"{'':>10} {'':>11} {fit(sizes, [row[5] for row in rows]):5.2f}")
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(description="Масштабирование лексера, парсера и генератора")
+    ap.add_argument("dimensions", nargs="*", help=f"измерения: {', '.join(DIMENSIONS)} (по умолчанию - все)")
+    ap.add_argument("-s", "--steps", type=int, default=6, help="число удвоений размера")
+    args = ap.parse_args(argv)
+    unknown = [name for name in args.dimensions if name not in DIMENSIONS]
+    if unknown:
+        ap.error(f"unknown dimension {unknown[0]}")
+    fd, path = tempfile.mkstemp(suffix=".java")
+    os.close(fd)
+    try:
+        for name in args.dimensions or DIMENSIONS:
+            sweep(name, args.steps, path)
+    finally:
+        os.remove(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
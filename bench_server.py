@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+
+from Server import TranslationPool, TranslationServer, percentile
+
+
+"""
+Нагрузочный тест сервера перевода: c клиентских потоков шлют всего n запросов
+POST /translate с одним исходником и меряют задержку каждого ответа. Ответы
+503 (пул занят) считаются отдельно и повторяются. Без --url и --socket сервер
+с пулом из -j процессов поднимается в этом же процессе на свободном порту.
+Для сравнения печатается время запуска main.py на тот же файл.
+    python bench_server.py -n 2000 -c 16 input.txt
+"""
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def connect(url, path):
+    if path is not None:
+        return _UnixConnection(path)
+    parts = urlsplit(url)
+    return http.client.HTTPConnection(parts.hostname, parts.port)
+
+
+def client(url, path, body, count, latencies, rejected):
+    conn = connect(url, path)
+    done = 0
+    while done < count:
+        start = time.perf_counter()
+        conn.request("POST", "/translate", body, {"Content-Type": "text/x-java"})
+        response = conn.getresponse()
+        response.read()
+        if response.status == 503:
+            rejected.append(1)
+            time.sleep(0.01)
+            continue
+        latencies.append(time.perf_counter() - start)
+        done += 1
+    conn.close()
+
+
+def cli_time(source):
+    with tempfile.TemporaryDirectory() as out:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py"),
+                        source, "-o", out, "-j", "1"], stdout=subprocess.DEVNULL, check=False)
+        return time.perf_counter() - start
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(description="Нагрузочный тест сервера перевода")
+    ap.add_argument("source", nargs="?", default="input.txt", help="исходник на Java для запросов")
+    ap.add_argument("-n", "--requests", type=int, default=2000)
+    ap.add_argument("-c", "--clients", type=int, default=8)
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="процессы встроенного сервера")
+    ap.add_argument("--url", default=None, help="адрес запущенного сервера, например http://127.0.0.1:8765")
+    ap.add_argument("--socket", default=None, help="Unix-сокет запущенного сервера")
+    args = ap.parse_args(argv)
+
+    with open(args.source, "rb") as f:
+        body = f.read()
+    server = pool = None
+    url = args.url
+    if url is None and args.socket is None:
+        pool = TranslationPool(args.jobs)
+        pool.warm_up()
+        server = TranslationServer(pool, port=0)
+        server.start()
+        url = server.address
+
+    latencies = []
+    rejected = []
+    per_client = [args.requests // args.clients + (i < args.requests % args.clients) for i in range(args.clients)]
+    threads = [threading.Thread(target=client, args=(url, args.socket, body, count, latencies, rejected))
+               for count in per_client]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.close()
+        pool.close()
+
+    latencies.sort()
+    print(f"{len(latencies)} requests, {args.clients} clients, {elapsed:.2f} s, "
+          f"{len(latencies) / elapsed:.0f} req/s, {len(rejected)} rejected (503)")
+    print(f"latency: p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    print(f"main.py per file: {cli_time(args.source) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,50 @@
+import sys
+import time
+
+from Lexer_java import Lexer, SyntaxError
+from Translator import collect_sources
+
+
+"""
+Сверка движков лексера на корпусе: каждый файл разбирается на токены
+посимвольным движком и движком на регулярном выражении, потоки
+токенов (включая ошибку, если она была) должны совпасть.
+    python check_lexer.py src/ "tests/**/*.java"
+"""
+def tokens(source, engine):
+    lexer = Lexer(source, engine)
+    result = []
+    try:
+        while True:
+            token = lexer.get_next_token()
+            result.append((token.name, token.value))
+            if token.value == Lexer.STATES[Lexer.EOF]:
+                return result
+    except SyntaxError as e:
+        result.append(("SyntaxError", e.text))
+        return result
+
+
+def main(inputs):
+    sources = [path for path, _ in collect_sources(inputs)]
+    mismatches = 0
+    elapsed = {Lexer.CHAR_ENGINE: 0.0, Lexer.REGEX_ENGINE: 0.0}
+    count = 0
+    for path in sources:
+        streams = {}
+        for engine in elapsed:
+            start = time.perf_counter()
+            streams[engine] = tokens(path, engine)
+            elapsed[engine] += time.perf_counter() - start
+        count += len(streams[Lexer.CHAR_ENGINE])
+        if streams[Lexer.CHAR_ENGINE] != streams[Lexer.REGEX_ENGINE]:
+            mismatches += 1
+            print(f"MISMATCH {path}")
+    print(f"{len(sources)} files, {count} tokens, {mismatches} mismatches")
+    for engine, seconds in elapsed.items():
+        print(f"{engine:>6}: {seconds:.3f} s, {count / seconds if seconds else 0:.0f} tokens/s")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or ["./input.txt"]))
@@ -1,22 +1,159 @@
+import sys
+import argparse
+
 from Parser_java import *
+from Lexer_java import TokenBuffer
+from Translator import TranslationError, parse, generate, translate_tree, TreeOptions
+from Stats import TranslationStats
+from TranslationCache import TranslationCache
+from Watcher import TreeWatcher, make_watcher
+from Server import TranslationPool, TranslationServer
+from ParallelParser import parse_methods
 
 
-def main():
-    l = Lexer("./input.txt")
-    print("\n-------------------ИСХОДНАЯ ПРОГРАММА НА JAVA------------------------")
-    with open("./input.txt") as f:
-        # print file
-        print(f.read())
-    prs = Parser(l)
-    prs = prs.parse()
-    cg = CodeGenerator(prs)
+def main(args):
+    stats = TranslationStats() if args.stats else None
+    if args.echo:
+        print("\n-------------------ИСХОДНАЯ ПРОГРАММА НА JAVA------------------------")
+        with open("./input.txt") as f:
+            # print file
+            print(f.read())
+    try:
+        if args.split_methods:
+            # Методы класса разбираются и переводятся в -j процессах
+            with open("./input.txt") as f:
+                prs, code = parse_methods(f.read(), "./input.txt", args.lexer, args.jobs, stats=stats)
+        else:
+            prs = parse("./input.txt", args.lexer, stats)
+            code = generate(prs, stats)
+    except TranslationError as e:
+        print(e.message)
+        print_stats(args, stats)
+        sys.exit(1)
     print("\n-------------------------ПРОГРАММА НА C#----------------------------")
-    print(cg)
+    print(code)
+
+    if args.tree is not False:
+        print("\n-------------------------ДЕРЕВО РАЗБОРА----------------------------")
+        tree_options(args).dump(prs, sys.stdout)
+        print()
+    print_stats(args, stats)
+
+
+# Счетчики перевода - в stderr, чтобы не смешивать их с переводом в stdout
+def print_stats(args, stats):
+    if stats is not None:
+        print(stats.to_json() if args.stats == "json" else stats, file=sys.stderr)
+
+
+def report(source, target, error, elapsed):
+    if error is None:
+        print(f"OK    {source} -> {target} ({elapsed * 1000:.1f} ms)", flush=True)
+    else:
+        print(f"FAIL  {source}: {error}", flush=True)
+
+
+def batch(args):
+    tree = tree_options(args) if args.tree else None
+    cache = TranslationCache(args.cache, args.cache_size * 2 ** 20) if args.cache else None
+    stats = TranslationStats() if args.stats else None
+    result = translate_tree(args.inputs, args.output, args.pattern, args.jobs, report, args.lexer, tree,
+                            args.save_ast, cache, stats)
+    print(result)
+    if result.cache is not None:
+        print(result.cache)
+    print_stats(args, result.stats)
+    return 1 if result.failed else 0
+
+
+def watch(args):
+    tree = tree_options(args) if args.tree else None
+    watcher = TreeWatcher(args.inputs, args.output, args.pattern, report, args.lexer, tree, args.save_ast)
+    print(f"Слежение за {', '.join(watcher.roots)}, Ctrl+C - выход", flush=True)
+    try:
+        watcher.run(make_watcher(watcher.roots, watcher.match, args.poll))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def serve(args):
+    pool = TranslationPool(args.jobs, args.lexer, args.max_pending)
+    try:
+        server = TranslationServer(pool, args.port, args.socket)
+    except OSError as e:
+        print(e, file=sys.stderr)
+        pool.close()
+        return 1
+    pool.warm_up()
+    print(f"Сервер перевода на {server.address}, {pool.workers} процессов, Ctrl+C - выход", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        pool.close()
+    return 0
+
+
+def tree_options(args):
+    return TreeOptions(args.tree_depth, args.tree_select)
 
-    print("\n-------------------------ДЕРЕВО РАЗБОРА----------------------------")
-    print(prs)
 
+def parse_args(argv):
+    ap = argparse.ArgumentParser(description="Транслятор Java -> C#")
+    ap.add_argument("inputs", nargs="*",
+                    help="каталоги, glob-шаблоны или файлы; без аргументов переводится ./input.txt")
+    ap.add_argument("-o", "--output", default="out", help="корень зеркального дерева для .cs файлов")
+    ap.add_argument("-p", "--pattern", default="*.java", help="маска файлов при обходе каталогов")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="число процессов (по умолчанию - число ядер)")
+    ap.add_argument("--lexer", choices=[Lexer.CHAR_ENGINE, Lexer.REGEX_ENGINE, Lexer.STREAM_ENGINE, TokenBuffer.ENGINE], default=Lexer.CHAR_ENGINE,
+                    help="движок лексического анализа")
+    ap.add_argument("--echo", action="store_true", help="вывести исходную программу перед переводом")
+    ap.add_argument("--tree", action=argparse.BooleanOptionalAction, default=None,
+                    help="печатать дерево разбора (по умолчанию - только для ./input.txt; "
+                         "в пакетном режиме дерево пишется в .tree рядом с .cs)")
+    ap.add_argument("--tree-depth", type=int, default=None, metavar="N",
+                    help="печатать не больше N уровней вложенности дерева")
+    ap.add_argument("--tree-select", default=None, metavar="NAME",
+                    help="печатать только поддеревья узлов с таким классом или id, например main")
+    ap.add_argument("--save-ast", action="store_true",
+                    help="в пакетном режиме сохранить дерево разбора в .jast рядом с .cs; "
+                         "такие файлы потом переводятся без повторного разбора (-p \"*.jast\")")
+    ap.add_argument("--cache", default=None, metavar="DIR",
+                    help="кэш переводов: неизмененные файлы берутся из DIR без разбора")
+    ap.add_argument("--cache-size", type=int, default=512, metavar="MB",
+                    help="предельный размер кэша, давно не использованные записи вытесняются")
+    ap.add_argument("--stats", nargs="?", const="text", choices=["text", "json"], default=None,
+                    help="вывести в stderr время фаз (чтение, лексер, парсер, генерация) и счетчики разбора")
+    ap.add_argument("--watch", action="store_true",
+                    help="перевести файлы и дальше переводить каждый файл заново при его сохранении")
+    ap.add_argument("--poll", action="store_true",
+                    help="в режиме --watch опрашивать файлы вместо inotify")
+    ap.add_argument("--serve", action="store_true",
+                    help="запустить сервер перевода (POST /translate) с пулом из -j процессов")
+    ap.add_argument("--port", type=int, default=8765, help="порт сервера на 127.0.0.1")
+    ap.add_argument("--socket", default=None, metavar="PATH", help="слушать Unix-сокет PATH вместо порта")
+    ap.add_argument("--max-pending", type=int, default=None, metavar="N",
+                    help="сколько запросов сервер принимает одновременно, остальным отвечает 503 "
+                         "(по умолчанию - по два на процесс)")
+    ap.add_argument("--split-methods", action="store_true",
+                    help="разбирать методы ./input.txt параллельно в -j процессах (для одного большого класса)")
+    args = ap.parse_args(argv)
+    if args.split_methods and (args.inputs or args.serve):
+        ap.error("--split-methods работает только для ./input.txt")
+    if args.watch and not args.inputs:
+        ap.error("--watch требует каталог, glob-шаблон или файлы")
+    return args
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args(sys.argv[1:])
+    if args.serve:
+        sys.exit(serve(args))
+    if args.watch:
+        sys.exit(watch(args))
+    if args.inputs:
+        sys.exit(batch(args))
+    main(args)
@@ -0,0 +1,67 @@
+import unittest
+
+from Parser_java import NodeIntLiteral, NodeFloatLiteral, NodePlus, NodeMultiply, NodeDivision, NodeMod
+from Translator import translate_text, TranslationError
+
+
+def _int(value):
+    return NodeIntLiteral(value, "int")
+
+
+# Тело метода main в одном классе - как его переводит Translator
+def _translate(body):
+    code = translate_text("public class A {\npublic static void main(int q) {\n" + body + "\n}\n}\n")
+    inner = code[code.index("{", code.index("main")) + 1:code.rindex("}", 0, code.rindex("}"))]
+    return " ".join(inner.split())
+
+
+# Свертка констант по правилам Java (Node.fold и Optimizer.fold_constants)
+class FoldTest(unittest.TestCase):
+    def test_int_wraparound(self):
+        self.assertEqual(NodePlus(_int("2147483647"), _int("1")).fold().value, "-2147483648")
+        self.assertEqual(NodeMultiply(_int("65536"), _int("65536")).fold().value, "0")
+        self.assertEqual(_translate("int a = 2147483647 + 1;"), "int a = -2147483648;")
+
+    def test_division_truncates_toward_zero(self):
+        self.assertEqual(NodeDivision(_int("-7"), _int("2")).fold().value, "-3")
+        self.assertEqual(NodeDivision(_int("7"), _int("-2")).fold().value, "-3")
+        self.assertEqual(NodeMod(_int("-7"), _int("2")).fold().value, "-1")
+        self.assertEqual(NodeDivision(NodeFloatLiteral("7.0", "double"), _int("2")).fold().value, "3.5")
+
+    def test_octal(self):
+        self.assertEqual(_translate("int a = 010;"), "int a = 8;")
+        self.assertEqual(_translate("int a = 010 + 1;"), "int a = 9;")
+        self.assertEqual(_translate("int s = 1;\ns = 010 + 1;"), "int s = 1; s = 9;")
+        self.assertEqual(NodePlus(_int("037777777777"), _int("0")).fold().value, "-1")
+        # 09 в Java - ошибка, а не число: не сворачивается
+        self.assertIsNone(NodePlus(_int("09"), _int("1")).fold())
+
+    def test_division_by_zero_is_not_folded(self):
+        self.assertIsNone(NodeDivision(_int("1"), _int("0")).fold())
+        self.assertIsNone(NodeMod(_int("1"), _int("0")).fold())
+        self.assertEqual(_translate("int a = 1 / 0;"), "int a = (1 / 0);")
+
+
+# Проверка типа инициализатора объявления, в том числе не литерала
+class DeclarationTypeTest(unittest.TestCase):
+    def test_non_literal_initializer(self):
+        self.assertEqual(_translate("int x = 5;\nint b = x;"), "int x = 5; int b = x;")
+        self.assertEqual(_translate("boolean b = 1 < 2;"), "boolean b = true;")
+
+    def test_type_mismatch(self):
+        with self.assertRaises(TranslationError):
+            _translate("int x = 5;\nboolean b = x;")
+        with self.assertRaises(TranslationError):
+            _translate("int x = 5;\nboolean b = " + " + ".join(["x"] * 5000) + ";")
+
+    # Тип выводится без рекурсии - глубина инициализатора не ограничена стеком Python
+    def test_long_initializer(self):
+        chain = " + ".join(["x"] * 5000)
+        self.assertEqual(_translate(f"int x = 5;\nint b = {chain};").count("x"), 5001)
+        nested = "x + (" * 3000 + "x" + ")" * 3000
+        self.assertEqual(_translate(f"int x = 5;\nint b = {nested};").count("x"), 3002)
+        self.assertEqual(_translate(f"int x = 5;\nboolean b = {chain} < 1;").count("x"), 5001)
+
+
+if __name__ == "__main__":
+    unittest.main()
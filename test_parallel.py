@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+import Translator
+import Incremental
+import ParallelParser
+from Lexer_java import Lexer, TokenBuffer
+from Stats import TranslationStats
+
+
+ENGINES = (Lexer.CHAR_ENGINE, Lexer.REGEX_ENGINE, Lexer.STREAM_ENGINE, TokenBuffer.ENGINE)
+
+
+def _source(methods):
+    parts = ["public class A {\n"]
+    for i in range(methods):
+        parts.append(f"public static int m{i}(int q) {{\nint a = {i} + 1;\nwhile (a < 3) {{\na = a + 1;\n}}\n"
+                     f"while (1 > 2) {{\na = 0;\n}}\n}}\n")
+    parts.append("}\n")
+    return "".join(parts)
+
+
+# Разбор методов по кускам; исполнитель - пул потоков, чтобы видеть, какой лексер создается
+class ParallelParserTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(2)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_same_as_full_parse(self):
+        text = _source(20)
+        for engine in ENGINES:
+            with self.subTest(engine):
+                program, code = ParallelParser.parse_methods(text, engine=engine, workers=2, executor=self.executor)
+                self.assertEqual(code, Translator.translate_text(text, engine))
+                self.assertEqual(len(program.children), 20)
+
+    def test_methods_use_requested_engine(self):
+        text = _source(8)
+        for engine in ENGINES:
+            with self.subTest(engine):
+                engines = []
+
+                def make_lexer(source, lexer_engine=Lexer.CHAR_ENGINE, stats=None):
+                    engines.append(lexer_engine)
+                    return Translator.make_lexer(source, lexer_engine, stats)
+
+                with mock.patch.object(Incremental, "make_lexer", make_lexer), \
+                        mock.patch.object(ParallelParser, "make_lexer", make_lexer), \
+                        mock.patch.object(ParallelParser, "parse_text", side_effect=AssertionError("full parse")):
+                    ParallelParser.translate_methods(text, engine=engine, workers=2, executor=self.executor)
+                # Заголовок, 8 заголовков методов и 8 тел
+                self.assertEqual(engines, [engine] * 17)
+
+    def test_stats_are_merged(self):
+        text = _source(8)
+        stats = TranslationStats()
+        ParallelParser.parse_methods(text, workers=2, executor=self.executor, stats=stats)
+        full = TranslationStats()
+        Translator.parse_text(text, stats=full)
+        self.assertEqual(stats.files, 1)
+        self.assertEqual(stats.nodes, full.nodes)
+        self.assertEqual((stats.folded, stats.eliminated), (full.folded, full.eliminated))
+        self.assertEqual((stats.folded, stats.eliminated), (8, 8))
+        self.assertGreater(stats.tokens, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
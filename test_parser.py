@@ -0,0 +1,36 @@
+import unittest
+
+from Translator import translate_text, TranslationError
+
+
+DEPTH = 3000
+
+
+def _program(body):
+    return "public class A {\npublic static void main(int q) {\n" + body + "\n}\n}\n"
+
+
+# Вложенные операторы разбираются без рекурсии - глубина не ограничена стеком Python
+class NestingTest(unittest.TestCase):
+    def test_nested_if(self):
+        body = "int a = 1;\n" + "if (q < 1) {\n" * DEPTH + "a = 2;\n" + "} else {\na = 3;\n}\n" * DEPTH
+        code = translate_text(_program(body))
+        self.assertEqual(code.count("if ("), DEPTH)
+        self.assertEqual(code.count("a = 3;"), DEPTH)
+
+    def test_nested_while(self):
+        body = "int a = 1;\n" + "while (q < 1) {\n" * DEPTH + "a = 2;\n" + "}\n" * DEPTH
+        code = translate_text(_program(body))
+        self.assertEqual(code.count("while ("), DEPTH)
+        self.assertEqual(code.count("a = 2;"), 1)
+
+    # Ошибка в самом глубоком блоке: восстановление как при неглубокой вложенности
+    def test_error_in_nested_block(self):
+        body = "int a = 1;\n" + "while (q < 1) {\n" * DEPTH + "a = 1 1;\n" + "}\n" * DEPTH
+        with self.assertRaises(TranslationError) as caught:
+            translate_text(_program(body))
+        self.assertIn(f"Missing special symbol ';' in line {DEPTH + 3}", str(caught.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
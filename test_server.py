@@ -0,0 +1,77 @@
+import os
+import json
+import socket
+import tempfile
+import unittest
+
+from Server import TranslationPool, TranslationServer
+from bench_server import connect
+
+
+SOURCE = "public class A {\npublic static void main(int q) {\nint a = 1 + 2;\n}\n}\n"
+
+
+# Запрос и ответ по HTTP поверх TCP или Unix-сокета, как их делает bench_server
+class ServerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = TranslationPool(1)
+        cls.directory = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        cls.directory.cleanup()
+
+    def _serve(self, path=None):
+        server = TranslationServer(self.pool, 0, path)
+        server.start()
+        self.addCleanup(server.close)
+        return server
+
+    def _post(self, server, path=None):
+        conn = connect(server.address if path is None else None, path)
+        try:
+            conn.request("POST", "/translate", SOURCE.encode(), {"Content-Type": "text/x-java"})
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            conn.close()
+
+    def test_unix_socket_round_trip(self):
+        path = os.path.join(self.directory.name, "server.sock")
+        server = self._serve(path)
+        # Соединение держится между запросами - оба должны дойти
+        for _ in range(2):
+            status, body = self._post(server, path)
+            self.assertEqual(status, 200)
+            self.assertIn("int a = 3;", body["code"])
+
+    def test_tcp_round_trip(self):
+        status, body = self._post(self._serve())
+        self.assertEqual(status, 200)
+        self.assertIn("int a = 3;", body["code"])
+
+    def test_socket_path_is_not_overwritten(self):
+        path = os.path.join(self.directory.name, "input.txt")
+        with open(path, "w") as f:
+            f.write(SOURCE)
+        with self.assertRaises(FileExistsError):
+            TranslationServer(self.pool, 0, path)
+        with open(path) as f:
+            self.assertEqual(f.read(), SOURCE)
+
+    def test_invalid_content_length(self):
+        server = self._serve()
+        host, port = server.server.server_address[:2]
+        for length in ("abc", "-1", "1e3"):
+            with socket.create_connection((host, port), timeout=5) as sock:
+                sock.sendall(f"POST /translate HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n".encode())
+                reply = b""
+                while chunk := sock.recv(4096):
+                    reply += chunk
+            self.assertTrue(reply.startswith(b"HTTP/1.1 400"), reply)
+
+
+if __name__ == "__main__":
+    unittest.main()
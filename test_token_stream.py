@@ -0,0 +1,129 @@
+import io
+import unittest
+
+from Lexer_java import Lexer, TokenStream, TokenBuffer, SyntaxError as LexerSyntaxError
+
+
+SOURCE = "int a = 1 ;\nint b = a + 2 ;\nc = 3 ;"
+ENGINES = (Lexer.CHAR_ENGINE, Lexer.REGEX_ENGINE, Lexer.STREAM_ENGINE)
+
+
+def _lexer(text, engine):
+    return Lexer(io.StringIO(text), engine)
+
+
+# Все токены файла с lineno, position и state лексера после каждого
+def _tokens(lexer):
+    result = []
+    while True:
+        token = lexer.get_next_token()
+        result.append((token.name, lexer.lineno, lexer.position, lexer.state))
+        if token.value == Lexer.STATES[Lexer.EOF]:
+            return result
+
+
+def _next(stream):
+    token = stream.get_next_token()
+    return token.name, stream.lineno, stream.position, stream.state
+
+
+# Заглядывание вперед и возврат к меткам у TokenStream и TokenBuffer
+class TokenStreamTest(unittest.TestCase):
+    def streams(self, text=SOURCE):
+        for engine in ENGINES:
+            yield engine, TokenStream(_lexer(text, engine), capacity=2)
+        yield TokenBuffer.ENGINE, TokenBuffer(_lexer(text, Lexer.REGEX_ENGINE))
+
+    def test_peek_does_not_advance(self):
+        for engine, stream in self.streams():
+            with self.subTest(engine):
+                expected = _tokens(_lexer(SOURCE, Lexer.REGEX_ENGINE if engine == TokenBuffer.ENGINE else engine))
+                self.assertEqual(_next(stream), expected[0])
+                self.assertEqual([stream.peek(k).name for k in (1, 2, 5)],
+                                 [expected[1][0], expected[2][0], expected[5][0]])
+                # Текущий токен и его позиция после peek те же
+                self.assertEqual((stream.lineno, stream.position, stream.state), expected[0][1:])
+                self.assertEqual([_next(stream) for _ in expected[1:]], expected[1:])
+                self.assertEqual(stream.peek(3).value, Lexer.STATES[Lexer.EOF])
+
+    def test_nested_marks(self):
+        for engine, stream in self.streams():
+            with self.subTest(engine):
+                first = _next(stream)
+                outer = stream.mark()
+                inner = stream.mark()
+                consumed = [_next(stream) for _ in range(3)]
+                # Снятие внутренней метки на том же месте не трогает внешнюю
+                stream.release(inner)
+                _next(stream)
+                stream.reset(outer)
+                self.assertEqual((stream.lineno, stream.position, stream.state), first[1:])
+                self.assertEqual([_next(stream) for _ in range(3)], consumed)
+
+    def test_reset_inner_then_outer(self):
+        for engine, stream in self.streams():
+            with self.subTest(engine):
+                _next(stream)
+                outer = stream.mark()
+                a = _next(stream)
+                inner = stream.mark()
+                b = _next(stream)
+                stream.reset(inner)
+                self.assertEqual(_next(stream), b)
+                stream.reset(outer)
+                self.assertEqual([_next(stream), _next(stream)], [a, b])
+
+    def test_released_mark(self):
+        stream = TokenStream(_lexer(SOURCE, Lexer.CHAR_ENGINE))
+        stream.get_next_token()
+        outer = stream.mark()
+        inner = stream.mark()
+        stream.release(outer)
+        with self.assertRaises(ValueError):
+            stream.reset(inner)
+
+    def test_buffer_grows_under_mark(self):
+        text = " ".join(f"a{i}" for i in range(100))
+        stream = TokenStream(_lexer(text, Lexer.CHAR_ENGINE), capacity=2)
+        stream.get_next_token()
+        m = stream.mark()
+        names = [stream.get_next_token().name for _ in range(50)]
+        stream.reset(m)
+        self.assertEqual([stream.get_next_token().name for _ in range(50)], names)
+
+    def test_lexical_error_in_lookahead(self):
+        text = "int a = 1 ; 1.2.3 b ;"
+        for engine in ENGINES:
+            with self.subTest(engine):
+                stream = TokenStream(_lexer(text, engine))
+                stream.get_next_token()
+                # peek пропускает ошибку, а get_next_token бросает ее на ее месте
+                self.assertEqual([stream.peek(k).name for k in range(1, 5)], ["a", "=", "1", ";"])
+                for _ in range(4):
+                    stream.get_next_token()
+                with self.assertRaises(LexerSyntaxError):
+                    stream.get_next_token()
+
+    # Ошибки TokenBuffer бросаются на своем месте, как у движка regex, и разбор идет дальше
+    def test_buffer_errors_in_place(self):
+        text = "int a = 1 ; 1.2.3 b ; 12a c /* x"
+
+        def run(lexer):
+            result = []
+            while True:
+                try:
+                    token = lexer.get_next_token()
+                except LexerSyntaxError as e:
+                    result.append(("error", str(e)))
+                    continue
+                result.append((token.name, lexer.lineno, lexer.position))
+                if token.value == Lexer.STATES[Lexer.EOF]:
+                    return result
+
+        result = run(TokenBuffer(_lexer(text, Lexer.REGEX_ENGINE)))
+        self.assertEqual(result, run(_lexer(text, Lexer.REGEX_ENGINE)))
+        self.assertEqual([item[0] for item in result].count("error"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()